@@ -4,20 +4,109 @@
 # Purpose: Independent Research Study
 
 import os
-import glob
 import json
+import dataclasses
 import yaml
-from typing import List, Tuple
-from ..core.types import FrameData, MaskData, FrameQuality, NightReport
+import numpy as np
+from pathlib import Path
+from astropy.io import fits
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Container, Dict, List, NamedTuple, Optional, Tuple
+from ..core.types import FrameData, MaskData, FrameQuality, NightReport, QualityAccumulator
 from ..core.io_fits import read_fits, write_fits
+from ..core.io_json import write_json, json_line
 from ..streak_detection.baseline_detector import BaselineDetector
 from ..metrics.frame_metrics import compute_frame_metrics
 from ..metrics.night_metrics import aggregate_night_metrics
-from ..skyglow.odc_estimator import ODCEstimator
+from ..skyglow.odc_estimator import ODCEstimator, estimate_background_robust
 from ..core.logging import get_logger
 
 logger = get_logger()
 
+# Records what run_on_folder produced, so a re-run can skip unchanged frames
+_MANIFEST_NAME = "run_manifest.json"
+
+# Frame header cards carried over to the mask FITS
+_MASK_HEADER_KEYWORDS = ('DATE-OBS', 'OBJECT', 'EXPTIME', 'FILTER')
+
+
+class DetCfg(NamedTuple):
+    """Frozen detector settings; small enough to hand to every worker process."""
+    threshold_sigma: float = 5.0
+    line_width: int = 3
+    theta_resolution_deg: float = 1.0
+
+
+# Detector built once per worker process by _init_worker
+_worker_detector: Optional[BaselineDetector] = None
+
+
+def _init_worker(det_cfg: DetCfg) -> None:
+    """ProcessPoolExecutor initializer: build the detector once per worker."""
+    global _worker_detector
+    _worker_detector = BaselineDetector(**det_cfg._asdict())
+
+
+# Per-process buffer for the masked-median gather, reused across frames
+_background_scratch: Optional[np.ndarray] = None
+
+
+def _frame_background(image: np.ndarray, mask: np.ndarray) -> float:
+    """estimate_background_robust using this process's reusable scratch buffer."""
+    global _background_scratch
+    dtype = image.dtype.newbyteorder('=')
+    if (_background_scratch is None or _background_scratch.dtype != dtype
+            or _background_scratch.size < image.size):
+        _background_scratch = np.empty(image.size, dtype=dtype)
+    return estimate_background_robust(image, mask, scratch=_background_scratch)
+
+
+def _process_frame_job(
+    frame_path: str,
+    mask_dir: Path,
+    detector: Optional[BaselineDetector] = None
+) -> Tuple[str, Optional[FrameQuality], Optional[float], Optional[bytes], Optional[str]]:
+    """
+    Detect, score and write the mask for one frame.
+    
+    Top-level so it can be pickled into a worker process. Writes the mask
+    FITS itself and only hands back the small per-frame results, including
+    the frame's already serialized qualities.jsonl record; errors are
+    returned instead of raised so the parent can log them.
+    
+    Args:
+        detector: Detector to use; defaults to the one _init_worker built
+                  for this worker process
+    
+    Returns:
+        (frame_path, quality, background, quality_line, error)
+    """
+    try:
+        detector = detector or _worker_detector
+        frame = read_fits(frame_path)
+        mask = detector.detect(frame.data)
+        quality = compute_frame_metrics(frame, mask)
+        
+        # Write mask
+        # Small new header with only the observation cards the mask needs,
+        # instead of copying every card of the frame header
+        mask_out = mask_dir / f"{Path(frame_path).stem}_mask.fits"
+        mask_header = fits.Header()
+        for key in _MASK_HEADER_KEYWORDS:
+            value = frame.header.get(key)
+            if value is not None:
+                mask_header[key] = value
+        mask_header['OSS_MASK'] = True
+        write_fits(mask_out, mask.mask, header=mask_header)
+        
+        # ODC only needs the masked background level, not the image
+        background = _frame_background(frame.data, mask.mask)
+        return frame_path, quality, background, json_line(quality.to_dict()), None
+    
+    except Exception as e:
+        return frame_path, None, None, None, str(e)
+
+
 class OSSPipeline:
     def __init__(self, config_path: str = None):
         self.config = {}
@@ -27,85 +116,179 @@ class OSSPipeline:
         
         # Initialize components based on config
         det_conf = self.config.get("detection", {})
-        self.detector = BaselineDetector(
+        self._det_cfg = DetCfg(
             threshold_sigma=det_conf.get("threshold_sigma", 5.0),
-            line_width=det_conf.get("line_width", 3)
+            line_width=det_conf.get("line_width", 3),
+            theta_resolution_deg=det_conf.get("theta_resolution_deg", 1.0)
         )
+        self.detector = BaselineDetector(**self._det_cfg._asdict())
+        odc_conf = self.config.get("odc", {})
         self.odc_estimator = ODCEstimator(
-            bootstrap_samples=self.config.get("odc", {}).get("bootstrap_samples", 100)
+            bootstrap_samples=odc_conf.get("bootstrap_samples", 100),
+            n_jobs=odc_conf.get("n_jobs", 1),
+            seed=odc_conf.get("seed", 42)
         )
+        
+        # Frames are independent, so by default use every core
+        self.n_workers = self.config.get("processing", {}).get("n_workers") or os.cpu_count() or 1
 
-    def process_frame(self, frame_path: str) -> Tuple[FrameData, MaskData, FrameQuality]:
-        """Process a single frame."""
+    def process_frame(self, frame_path: str) -> Tuple[FrameData, MaskData, FrameQuality, float]:
+        """Process a single frame. Also returns its masked background level for ODC."""
         frame = read_fits(frame_path)
         mask = self.detector.detect(frame.data)
         quality = compute_frame_metrics(frame, mask)
-        return frame, mask, quality
+        background = _frame_background(frame.data, mask.mask)
+        return frame, mask, quality, background
 
     def run_on_folder(self, input_dir: str, output_dir: str):
         """Run pipeline on a folder."""
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             
-        mask_dir = os.path.join(output_dir, "masks")
-        quality_dir = os.path.join(output_dir, "quality")
-        os.makedirs(mask_dir, exist_ok=True)
-        os.makedirs(quality_dir, exist_ok=True)
+        mask_dir = Path(output_dir) / "masks"
+        mask_dir.mkdir(parents=True, exist_ok=True)
 
-        fits_files = sorted(glob.glob(os.path.join(input_dir, "*.fits")))
+        # One directory pass; skip truth files or masks if present in same dir
+        with os.scandir(input_dir) as it:
+            fits_files = [
+                e.path for e in it
+                if e.name.endswith(".fits") and not e.name.startswith(".")
+                and "_truth" not in e.name and "mask" not in e.name and e.is_file()
+            ]
+        fits_files.sort()
         logger.info(f"Found {len(fits_files)} FITS files in {input_dir}")
         
-        all_qualities = []
-        all_frames = [] # Keep in memory ONLY if needed for ODC and fits in ram. For MVP ok.
-        all_masks = []
+        # Reuse the results of a previous run for frames that have not changed since
+        stats = {fpath: os.stat(fpath) for fpath in fits_files}
+        cached = self._load_cached_results(output_dir, mask_dir, stats)
+        todo = [fpath for fpath in fits_files if fpath not in cached]
+        if cached:
+            logger.info(f"Reusing previous results for {len(cached)} unchanged frames")
         
-        for fpath in fits_files:
-            # Skip truth files or masks if present in same dir
-            if "_truth" in fpath or "mask" in fpath:
-                continue
-                
-            logger.info(f"Processing {os.path.basename(fpath)}...")
-            try:
-                frame, mask, quality = self.process_frame(fpath)
-                
-                # Save outputs
-                basename = os.path.basename(fpath)
-                mask_out = os.path.join(mask_dir, basename.replace(".fits", "_mask.fits"))
-                quality_out = os.path.join(quality_dir, basename.replace(".fits", "_quality.json"))
-                
-                # Write mask
-                # Add metadata to header
-                mask_header = frame.header.copy()
-                mask_header['OSS_MASK'] = True
-                write_fits(mask_out, mask.mask, header=mask_header)
-                
-                # Write quality
-                with open(quality_out, 'w') as f:
-                    json.dump(quality.to_dict(), f, indent=2)
-                
-                all_qualities.append(quality)
-                all_frames.append(frame)
-                all_masks.append(mask)
-                
-            except Exception as e:
-                logger.error(f"Failed to process {fpath}: {e}")
+        all_qualities = QualityAccumulator.with_capacity(len(fits_files))
+        backgrounds = []
+        background_paths = []
+        
+        # Per-frame quality records go to one JSON Lines file, written here in input order
+        with open(os.path.join(output_dir, "qualities.jsonl"), 'wb') as quality_file:
+            if self.n_workers == 1 or len(todo) <= 1:
+                fresh = (_process_frame_job(fpath, mask_dir, self.detector) for fpath in todo)
+                results = (cached.get(fpath) or next(fresh) for fpath in fits_files)
+                self._collect_results(results, quality_file, all_qualities, backgrounds, background_paths,
+                                      reused=cached)
+            else:
+                logger.info(f"Processing with {self.n_workers} worker processes")
+                # Workers get only the frozen detector settings, never the pipeline itself
+                with ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                         initargs=(self._det_cfg,)) as executor:
+                    # Hand out frames in small batches to cut inter-process overhead
+                    chunksize = max(1, len(todo) // (self.n_workers * 4))
+                    fresh = executor.map(_process_frame_job, todo, [mask_dir] * len(todo),
+                                         chunksize=chunksize)
+                    results = (cached.get(fpath) or next(fresh) for fpath in fits_files)
+                    self._collect_results(results, quality_file, all_qualities, backgrounds, background_paths,
+                                          reused=cached)
+
+        manifest = {
+            "detector": self._det_cfg._asdict(),
+            # Keyed by file name, like qualities.jsonl and the masks, so the same
+            # folder given by another path (or moved) still matches
+            "frames": {
+                os.path.basename(fpath): {"mtime": stats[fpath].st_mtime, "size": stats[fpath].st_size, "background": bg}
+                for fpath, bg in zip(background_paths, backgrounds)
+            }
+        }
+        write_json(os.path.join(output_dir, _MANIFEST_NAME), manifest)
 
         # Aggregate Night Report
         dataset_id = os.path.basename(os.path.normpath(input_dir))
         night_report = aggregate_night_metrics(all_qualities, dataset_id)
         
-        with open(os.path.join(output_dir, "night_summary.json"), 'w') as f:
-            # Simple dict dump for dataclass
-            # converting to dict via ... vars() or helper? 
-            # dataclasses.asdict is standard but let's just do manual for safety or use helper
-            import dataclasses
-            json.dump(dataclasses.asdict(night_report), f, indent=2)
+        write_json(os.path.join(output_dir, "night_summary.json"), dataclasses.asdict(night_report))
 
         # ODC Report
-        odc_report = self.odc_estimator.estimate(all_frames, all_masks)
+        odc_report = self.odc_estimator.estimate(backgrounds, background_paths)
         odc_report["dataset_id"] = dataset_id
         
-        with open(os.path.join(output_dir, "odc_report.json"), 'w') as f:
-            json.dump(odc_report, f, indent=2)
+        write_json(os.path.join(output_dir, "odc_report.json"), odc_report)
 
         logger.info("Pipeline run complete.")
+
+    def _load_cached_results(self, output_dir: str, mask_dir: Path,
+                             stats: Dict[str, os.stat_result]) -> Dict[str, tuple]:
+        """
+        Results of a previous run into output_dir that are still valid.
+        
+        A frame is reused when the manifest recorded the same size and mtime
+        for it under the same detector settings, its mask is at least as new
+        as the frame and its record is in the previous qualities.jsonl.
+        
+        Returns:
+            Mapping of frame path to a result tuple shaped like _process_frame_job's
+        """
+        manifest_path = os.path.join(output_dir, _MANIFEST_NAME)
+        quality_path = os.path.join(output_dir, "qualities.jsonl")
+        if not (os.path.exists(manifest_path) and os.path.exists(quality_path)):
+            return {}
+        
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            records = {}
+            with open(quality_path, 'rb') as f:
+                for line in f:
+                    record = json.loads(line)
+                    records[record["file"]] = (record, line)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring previous results in {output_dir}: {e}")
+            return {}
+        
+        if manifest.get("detector") != self._det_cfg._asdict():
+            return {}
+        
+        cached = {}
+        frames = manifest.get("frames", {})
+        for fpath, st in stats.items():
+            name = os.path.basename(fpath)
+            entry = frames.get(name)
+            record = records.get(name)
+            if entry is None or record is None:
+                continue
+            if entry["mtime"] != st.st_mtime or entry["size"] != st.st_size:
+                continue
+            mask_out = mask_dir / f"{Path(fpath).stem}_mask.fits"
+            if not mask_out.exists() or mask_out.stat().st_mtime < st.st_mtime:
+                continue
+            
+            background = entry["background"]
+            cached[fpath] = (
+                fpath,
+                FrameQuality.from_dict(record[0]),
+                np.nan if background is None else background,
+                record[1],
+                None
+            )
+        return cached
+
+    @staticmethod
+    def _collect_results(results, quality_file: BinaryIO, qualities: QualityAccumulator,
+                         backgrounds: List[float], paths: List[str],
+                         reused: Container[str] = ()) -> None:
+        """
+        Gather per-frame worker results (in input order) on the main process.
+        
+        Frames listed in reused come from a previous run and are not logged as processed.
+        """
+        for fpath, quality, background, quality_line, error in results:
+            if error is not None:
+                logger.error(f"Failed to process {fpath}: {error}")
+                continue
+            
+            if fpath in reused:
+                logger.debug(f"Reused {os.path.basename(fpath)}")
+            else:
+                logger.info(f"Processed {os.path.basename(fpath)}")
+            quality_file.write(quality_line)
+            qualities.add(quality)
+            backgrounds.append(background)
+            paths.append(fpath)
@@ -37,13 +37,15 @@ def run(
 @app.command()
 def generate_synthetic(
     output_dir: str = typer.Option("./data/synthetic", help="Output directory"),
-    count: int = typer.Option(10, help="Number of frames to generate")
+    count: int = typer.Option(10, help="Number of frames to generate"),
+    seed: int = typer.Option(42, help="Base seed; frame i uses seed + i"),
+    workers: Optional[int] = typer.Option(None, help="Worker processes (default: all cores)")
 ):
     """
     Generate synthetic dataset for testing.
     """
     setup_logging()
-    generate_dataset(output_dir, count)
+    generate_dataset(output_dir, count, base_seed=seed, n_workers=workers)
 
 
 if __name__ == "__main__":
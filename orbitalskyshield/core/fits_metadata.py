@@ -10,6 +10,8 @@ Extracts observational parameters from FITS headers needed for
 physical sky brightness modeling.
 """
 
+import os
+import functools
 import numpy as np
 from typing import Dict, Optional
 from datetime import datetime
@@ -41,54 +43,63 @@ def extract_observation_metadata(fits_path: str) -> Dict:
     Returns:
         Dictionary with extracted metadata
     """
-    with fits.open(fits_path) as hdul:
-        header = hdul[0].header
-        
-        metadata = {}
-        
-        # Datetime
-        metadata['date_obs'] = header.get('DATE-OBS', None)
-        if metadata['date_obs']:
-            try:
-                metadata['datetime'] = Time(metadata['date_obs']).datetime
-            except:
-                metadata['datetime'] = None
-        else:
+    # Cached on (path, mtime) so repeated lookups for the same frame don't
+    # reopen the file, while a rewritten file is picked up again.
+    # Hand out a copy so callers can't mutate the cached entry.
+    return dict(_extract_metadata_cached(fits_path, os.path.getmtime(fits_path)))
+
+
+@functools.lru_cache(maxsize=4096)
+def _extract_metadata_cached(fits_path: str, mtime: float) -> Dict:
+    """Uncached body of extract_observation_metadata (``mtime`` is only a cache key)."""
+    # Header only: the pixel data is never needed here
+    header = fits.getheader(fits_path, 0)
+    
+    metadata = {}
+    
+    # Datetime
+    metadata['date_obs'] = header.get('DATE-OBS', None)
+    if metadata['date_obs']:
+        try:
+            metadata['datetime'] = Time(metadata['date_obs']).datetime
+        except:
             metadata['datetime'] = None
-        
-        # Observer location
-        metadata['site_lat'] = header.get('SITELAT', header.get('LATITUDE', None))
-        metadata['site_lon'] = header.get('SITELONG', header.get('LONGITUD', None))
-        metadata['site_elev'] = header.get('SITEELEV', header.get('ELEVATIO', 0.0))
-        
-        # Pointing
-        metadata['ra'] = header.get('RA', header.get('OBJCTRA', None))
-        metadata['dec'] = header.get('DEC', header.get('OBJCTDEC', None))
-        metadata['azimuth'] = header.get('AZIMUTH', header.get('AZ', None))
-        metadata['altitude'] = header.get('ALTITUDE', header.get('ALT', None))
-        
-        # Zenith distance (if not  in header, calculate from altitude)
-        if metadata['altitude'] is not None:
-            metadata['zenith_distance'] = 90.0 - float(metadata['altitude'])
+    else:
+        metadata['datetime'] = None
+    
+    # Observer location
+    metadata['site_lat'] = header.get('SITELAT', header.get('LATITUDE', None))
+    metadata['site_lon'] = header.get('SITELONG', header.get('LONGITUD', None))
+    metadata['site_elev'] = header.get('SITEELEV', header.get('ELEVATIO', 0.0))
+    
+    # Pointing
+    metadata['ra'] = header.get('RA', header.get('OBJCTRA', None))
+    metadata['dec'] = header.get('DEC', header.get('OBJCTDEC', None))
+    metadata['azimuth'] = header.get('AZIMUTH', header.get('AZ', None))
+    metadata['altitude'] = header.get('ALTITUDE', header.get('ALT', None))
+    
+    # Zenith distance (if not  in header, calculate from altitude)
+    if metadata['altitude'] is not None:
+        metadata['zenith_distance'] = 90.0 - float(metadata['altitude'])
+    else:
+        metadata['zenith_distance'] = None
+    
+    # Airmass
+    metadata['airmass'] = header.get('AIRMASS', None)
+    if metadata['airmass'] is None and metadata['zenith_distance'] is not None:
+        # Calculate airmass from zenith distance (simple secant formula)
+        z_rad = np.radians(metadata['zenith_distance'])
+        if z_rad < np.radians(70):
+            metadata['airmass'] = 1.0 / np.cos(z_rad)
         else:
-            metadata['zenith_distance'] = None
-        
-        # Airmass
-        metadata['airmass'] = header.get('AIRMASS', None)
-        if metadata['airmass'] is None and metadata['zenith_distance'] is not None:
-            # Calculate airmass from zenith distance (simple secant formula)
-            z_rad = np.radians(metadata['zenith_distance'])
-            if z_rad < np.radians(70):
-                metadata['airmass'] = 1.0 / np.cos(z_rad)
-            else:
-                metadata['airmass'] = None
-        
-        # Exposure
-        metadata['exptime'] = header.get('EXPTIME', header.get('EXPOSURE', None))
-        
-        # Filter
-        metadata['filter'] = header.get('FILTER', header.get('FILTNAM', 'Unknown'))
-        
+            metadata['airmass'] = None
+    
+    # Exposure
+    metadata['exptime'] = header.get('EXPTIME', header.get('EXPOSURE', None))
+    
+    # Filter
+    metadata['filter'] = header.get('FILTER', header.get('FILTNAM', 'Unknown'))
+    
     return metadata
 
 
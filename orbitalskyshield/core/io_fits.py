@@ -8,16 +8,91 @@ import numpy as np
 from astropy.io import fits
 from .types import FrameData
 from .logging import get_logger
-from typing import Optional
+from typing import List, Optional, Tuple
+
+try:
+    import fitsio  # Optional: CFITSIO wrapper, much faster than astropy for bulk reads
+except ImportError:
+    fitsio = None
 
 logger = get_logger()
 
-def read_fits(path: str) -> FrameData:
+# Keywords describing the data layout; the writer regenerates these itself
+_STRUCTURAL_KEYWORDS = ("SIMPLE", "BITPIX", "NAXIS", "EXTEND", "XTENSION",
+                        "PCOUNT", "GCOUNT", "BSCALE", "BZERO")
+
+# Standard COMMENT cards that CFITSIO adds to every file it creates
+_CFITSIO_COMMENTS = ("FITS (Flexible Image Transport System)", "and Astrophysics', volume 376")
+
+
+def _is_structural(card: fits.Card) -> bool:
+    name = card.keyword
+    if name == "COMMENT":
+        return str(card.value).strip().startswith(_CFITSIO_COMMENTS)
+    return name in _STRUCTURAL_KEYWORDS or (name.startswith("NAXIS") and name[5:].isdigit())
+
+
+def _fitsio_header_to_astropy(hdr) -> fits.Header:
+    """Converts a fitsio FITSHDR into an astropy Header (what FrameData carries)."""
+    header = fits.Header()
+    for rec in hdr.records():
+        name = rec.get('name')
+        if not name:
+            continue
+        header.append(fits.Card(name, rec.get('value'), rec.get('comment') or ''), end=True)
+    return header
+
+
+def _astropy_header_to_records(header: fits.Header) -> List[dict]:
+    """Converts an astropy Header into fitsio header records."""
+    return [
+        # fitsio writes None as an undefined value; astropy's Undefined
+        # marker would otherwise be stored as its repr string
+        {'name': card.keyword,
+         'value': None if isinstance(card.value, fits.card.Undefined) else card.value,
+         'comment': card.comment}
+        for card in header.cards
+        if card.keyword and not _is_structural(card)
+    ]
+
+
+def _read_image_fitsio(path: str) -> Tuple[np.ndarray, fits.Header]:
+    with fitsio.FITS(path) as f:
+        # Science image is in the primary HDU, or the first extension if primary is empty
+        hdu = f[0]
+        if not hdu.has_data() and len(f) > 1:
+            hdu = f[1]
+        
+        if not hdu.has_data():
+            raise ValueError(f"No image data found in FITS file: {path}")
+        
+        return hdu.read(), _fitsio_header_to_astropy(hdu.read_header())
+
+
+def _read_image_astropy(path: str, memmap: Optional[bool] = None) -> Tuple[np.ndarray, fits.Header]:
+    with fits.open(path, memmap=memmap) as hdul:
+        # Assuming the science image is in the primary HDU or the first extension if primary is empty
+        # This logic mimics common astronomical packages
+        hdu = hdul[0]
+        if hdu.data is None and len(hdul) > 1:
+            hdu = hdul[1]
+        
+        if hdu.data is None:
+             raise ValueError(f"No image data found in FITS file: {path}")
+
+        # Copy header to avoid closed file issues
+        return hdu.data, hdu.header.copy()
+
+def read_fits(path: str, memmap: bool = False) -> FrameData:
     """
     Reads a FITS file and returns a FrameData object.
     
     Args:
         path: Absolute path to the FITS file.
+        memmap: Memory-map floating point data instead of reading it into RAM.
+                The array then keeps the file's (big-endian) byte order and
+                pages are only read when touched. Scaled integer images cannot
+                be mapped and are read normally.
         
     Returns:
         FrameData object containing data, header, and metadata.
@@ -30,28 +105,38 @@ def read_fits(path: str) -> FrameData:
         raise FileNotFoundError(f"File not found: {path}")
 
     try:
-        with fits.open(path) as hdul:
-            # Assuming the science image is in the primary HDU or the first extension if primary is empty
-            # This logic mimics common astronomical packages
-            hdu = hdul[0]
-            if hdu.data is None and len(hdul) > 1:
-                hdu = hdul[1]
-            
-            if hdu.data is None:
-                 raise ValueError(f"No image data found in FITS file: {path}")
+        raw = None
+        if memmap:
+            try:
+                raw, header = _read_image_astropy(path, memmap=True)
+            except ValueError:
+                # BZERO/BSCALE/BLANK images have to be scaled in memory
+                raw = None
+        if raw is None and fitsio is not None:
+            raw, header = _read_image_fitsio(path)
+        elif raw is None:
+            raw, header = _read_image_astropy(path)
 
-            data = hdu.data.astype(float) # Ensure float for processing
-            header = hdu.header.copy() # Copy header to avoid closed file issues
-            
-            # Extract timestamp if available
-            timestamp = header.get("DATE-OBS") or header.get("DATE")
-            
-            return FrameData(
-                data=data,
-                header=header,
-                path=path,
-                timestamp_utc=str(timestamp) if timestamp else None
-            )
+        # Ensure float for processing, without upcasting: floating data keeps its
+        # stored precision (in native byte order), integer data becomes float32.
+        # A mapped array is left in file byte order, swapping would copy it.
+        if memmap and np.issubdtype(raw.dtype, np.floating):
+            dtype = raw.dtype
+        elif np.issubdtype(raw.dtype, np.floating):
+            dtype = raw.dtype.newbyteorder('=')
+        else:
+            dtype = np.float32
+        data = raw.astype(dtype, copy=False)
+        
+        # Extract timestamp if available
+        timestamp = header.get("DATE-OBS") or header.get("DATE")
+        
+        return FrameData(
+            data=data,
+            header=header,
+            path=path,
+            timestamp_utc=str(timestamp) if timestamp else None
+        )
             
     except Exception as e:
         logger.error(f"Error reading FITS file {path}: {e}")
@@ -67,14 +152,21 @@ def write_fits(path: str, data: np.ndarray, header: Optional[fits.Header] = None
         header: Optional header to write.
         overwrite: Overwrite existing file.
     """
-    handoff_header = header.copy() if header else fits.Header()
-    
     # Ensure directory exists
     os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
     
-    hdu = fits.PrimaryHDU(data=data, header=handoff_header)
     try:
-        hdu.writeto(path, overwrite=overwrite)
+        # fitsio only pays off for uint8 masks; for float images (4096^2
+        # float32: ~0.05 s vs ~0.036 s) astropy's writer is faster
+        if fitsio is not None and data.dtype == np.uint8:
+            if os.path.exists(path) and not overwrite:
+                raise OSError(f"File {path} already exists.")
+            records = _astropy_header_to_records(header) if header else None
+            fitsio.write(path, data, header=records, clobber=True)
+        else:
+            handoff_header = header.copy() if header else fits.Header()
+            hdu = fits.PrimaryHDU(data=data, header=handoff_header)
+            hdu.writeto(path, overwrite=overwrite)
         logger.info(f"Saved FITS to {path}")
     except Exception as e:
         logger.error(f"Failed to write FITS to {path}: {e}")
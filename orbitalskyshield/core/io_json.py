@@ -0,0 +1,90 @@
+# Author: Andres Espin
+# Email: aaespin3@espe.edu.ec
+# Role: Junior Developer
+# Purpose: Independent Research Study
+
+import json
+import numpy as np
+from typing import Any, Dict, Iterable
+
+try:
+    import orjson  # Optional: C JSON encoder, serializes numpy scalars/arrays natively
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj: Any) -> Any:
+    """stdlib json fallback for the numpy types orjson handles itself."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def write_json(path: str, obj: Any) -> None:
+    """
+    Writes obj to path as indented (2 spaces) JSON.
+
+    Numpy scalars and arrays can be passed as-is. Uses orjson when installed
+    and the json module otherwise; note orjson writes NaN as null.
+
+    Args:
+        path: Output path.
+        obj: JSON-compatible object (dicts must have string keys).
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=_json_default)
+
+
+def _dumps_indented(obj: Any) -> bytes:
+    """obj as indented (2 spaces) JSON bytes, exactly as write_json writes it."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2, default=_json_default).encode()
+
+
+def write_json_rows(path: str, obj: Dict[str, Any], rows_key: str, rows: Iterable[Any]) -> None:
+    """
+    Writes obj plus a final rows_key list to path, streaming the list.
+    
+    The file is byte for byte what write_json(path, {**obj, rows_key: list(rows)})
+    writes, but each row is serialized and written as it is produced, so
+    the rows never have to exist as one Python list.
+    
+    Args:
+        path: Output path.
+        obj: JSON-compatible dict written before the rows (string keys).
+        rows_key: Key of the streamed list; it becomes the last key.
+        rows: JSON-compatible items of the list, e.g. a generator.
+    """
+    head = _dumps_indented({**obj, rows_key: []})
+    # Indented output ends in '[]' + newline + '}': reopen the empty list
+    with open(path, 'wb') as f:
+        f.write(head[:-len(b"[]\n}")] + b"[")
+        first = True
+        for row in rows:
+            # Rows sit two levels deep: indent every line of their own dump
+            f.write(b"\n    " if first else b",\n    ")
+            f.write(_dumps_indented(row).replace(b"\n", b"\n    "))
+            first = False
+        f.write(b"]\n}" if first else b"\n  ]\n}")
+
+
+def json_line(obj: Any) -> bytes:
+    """
+    Serializes obj as one compact, newline-terminated JSON Lines record.
+
+    Args:
+        obj: JSON-compatible object (dicts must have string keys).
+
+    Returns:
+        UTF-8 encoded line, ready to append to a .jsonl file.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, default=_json_default).encode() + b"\n"
@@ -0,0 +1,28 @@
+# Author: Andres Espin
+# Email: aaespin3@espe.edu.ec
+# Role: Junior Developer
+# Purpose: Independent Research Study
+
+"""
+Optional Numba support.
+
+Kernels are always decorated with ``njit``; when Numba is not installed the
+decorator is a no-op, so callers must check ``HAS_NUMBA`` and use their
+NumPy path instead of calling the (then pure-Python) kernel.
+"""
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (bare or with options)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
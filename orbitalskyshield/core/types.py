@@ -4,14 +4,18 @@
 # Purpose: Independent Research Study
 
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Union
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Union
 import numpy as np
-from astropy.io import fits
+
+if TYPE_CHECKING:
+    # Annotation only: importing the detectors (e.g. in worker processes)
+    # does not need astropy.io.fits loaded
+    from astropy.io import fits
 
 @dataclass
 class FrameData:
     data: np.ndarray  # 2D image data
-    header: fits.Header
+    header: "fits.Header"
     path: str
     timestamp_utc: Optional[str] = None
 
@@ -41,6 +45,64 @@ class FrameQuality:
             "detector": self.detector_info
         }
 
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "FrameQuality":
+        """Inverse of to_dict (e.g. for a record read back from qualities.jsonl)."""
+        return cls(
+            file=d["file"],
+            timestamp_utc=d["timestamp_utc"],
+            streak_area_fraction=d["streak_area_fraction"],
+            num_streaks=d["num_streaks"],
+            severity_score=d["severity_score"],
+            flags=d["flags"],
+            detector_info=d["detector"]
+        )
+
+@dataclass
+class QualityAccumulator:
+    """
+    Per-frame quality scalars stored column-wise for night aggregation.
+    
+    One contiguous array per field (instead of a list of FrameQuality
+    objects), pre-allocated for the expected number of frames; only the
+    first ``n_frames`` rows are valid.
+    """
+    fractions: np.ndarray
+    num_streaks: np.ndarray
+    severities: np.ndarray
+    n_frames: int = 0
+
+    @classmethod
+    def with_capacity(cls, capacity: int) -> "QualityAccumulator":
+        return cls(
+            fractions=np.empty(capacity, dtype=np.float64),
+            num_streaks=np.empty(capacity, dtype=np.int64),
+            severities=np.empty(capacity, dtype=np.float64)
+        )
+
+    @classmethod
+    def from_qualities(cls, qualities: List[FrameQuality]) -> "QualityAccumulator":
+        acc = cls.with_capacity(len(qualities))
+        for q in qualities:
+            acc.add(q)
+        return acc
+
+    def add(self, quality: FrameQuality) -> None:
+        i = self.n_frames
+        if i == len(self.fractions):
+            # Out of pre-allocated rows: grow geometrically
+            new_size = max(2 * i, 1)
+            self.fractions = np.resize(self.fractions, new_size)
+            self.num_streaks = np.resize(self.num_streaks, new_size)
+            self.severities = np.resize(self.severities, new_size)
+        self.fractions[i] = quality.streak_area_fraction
+        self.num_streaks[i] = quality.num_streaks
+        self.severities[i] = quality.severity_score
+        self.n_frames = i + 1
+
+    def __len__(self) -> int:
+        return self.n_frames
+
 @dataclass
 class NightReport:
     dataset_id: str
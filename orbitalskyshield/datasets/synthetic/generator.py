@@ -3,11 +3,13 @@
 # Role: Junior Developer
 # Purpose: Independent Research Study
 
+import os
 import numpy as np
-from typing import List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple, Optional, Union
 from ...core.types import FrameData, MaskData
 from ...core.io_fits import write_fits
-import os
 from astropy.io import fits
 from ...core.logging import get_logger
 
@@ -29,8 +31,8 @@ class SyntheticGenerator:
         xs = self.rng.integers(0, self.shape[1], size=num_stars)
         fluxes = self.rng.uniform(flux_range[0], flux_range[1], size=num_stars)
         
-        for x, y, f in zip(xs, ys, fluxes):
-            image[y, x] += f
+        # Unbuffered add so stars landing on the same pixel accumulate
+        np.add.at(image, (ys, xs), fluxes)
         return image
 
     def add_streak(self, image: np.ndarray, mask: np.ndarray, intensity: float = 1000.0, width: int = 3) -> Tuple[np.ndarray, np.ndarray]:
@@ -55,18 +57,19 @@ class SyntheticGenerator:
         
         # Add to mask (dilate by width/2)
         # For MVP, just mask the exact line and maybe 1 pixel neighbors
-        for i in range(-width // 2 + 1, width // 2 + 1):
-             # Simple horizontal/vertical dilation approximation
-             for dx in [0, 1]:
-                 for dy in [0, 1]:
-                     dx_shift, dy_shift = dx * i, dy * i
-                     x_curr = np.clip(xi + dx_shift, 0, self.shape[1]-1)
-                     y_curr = np.clip(yi + dy_shift, 0, self.shape[0]-1)
-                     mask[y_curr, x_curr] = 1
+        # Simple horizontal/vertical/diagonal dilation approximation: every line
+        # pixel shifted by (0, 0), (0, i), (i, 0) and (i, i), all in one broadcast
+        offsets = np.arange(-width // 2 + 1, width // 2 + 1)
+        zeros = np.zeros_like(offsets)
+        dx_shifts = np.concatenate([zeros, zeros, offsets, offsets])
+        dy_shifts = np.concatenate([zeros, offsets, zeros, offsets])
+        x_all = np.clip(np.add.outer(xi, dx_shifts).ravel(), 0, self.shape[1]-1)
+        y_all = np.clip(np.add.outer(yi, dy_shifts).ravel(), 0, self.shape[0]-1)
+        mask[y_all, x_all] = 1
                      
         return image, mask
 
-    def generate_frame(self, filename: str = "synth.fits", num_streaks: int = 2) -> None:
+    def generate_frame(self, filename: Union[str, Path] = "synth.fits", num_streaks: int = 2) -> None:
         """Generates a full synthetic frame and saves it."""
         image = self.generate_background()
         image = self.add_stars(image)
@@ -83,15 +86,41 @@ class SyntheticGenerator:
         write_fits(filename, image, header)
         
         # Save truth mask too
-        mask_filename = filename.replace(".fits", "_truth.fits")
+        path = Path(filename)
+        mask_filename = path.with_name(f"{path.stem}_truth.fits")
         header['MASKTYPE'] = 'TRUTH'
         write_fits(mask_filename, mask, header)
         logger.info(f"Generated {filename} and {mask_filename}")
 
-def generate_dataset(output_dir: str, n_frames: int = 5):
-    """CLI helper to generate a batch."""
-    os.makedirs(output_dir, exist_ok=True)
-    gen = SyntheticGenerator()
-    for i in range(n_frames):
-        fname = os.path.join(output_dir, f"frame_{i:03d}.fits")
-        gen.generate_frame(fname)
+def _gen_one(i: int, output_dir: Path, base_seed: int) -> None:
+    """Generates frame i with its own seed; top-level so worker processes can run it."""
+    gen = SyntheticGenerator(seed=base_seed + i)
+    gen.generate_frame(output_dir / f"frame_{i:03d}.fits")
+
+
+def generate_dataset(output_dir: str, n_frames: int = 5, base_seed: int = 42,
+                     n_workers: Optional[int] = None):
+    """
+    CLI helper to generate a batch.
+    
+    Frame i is drawn from its own generator seeded with base_seed + i, so the
+    dataset is the same whatever the number of workers.
+    
+    Args:
+        output_dir: Directory for the frames and their truth masks
+        n_frames: Number of frames
+        base_seed: Seed of frame 0
+        n_workers: Worker processes (None = all cores, 1 = serial)
+    """
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    n_workers = n_workers or os.cpu_count() or 1
+    
+    if n_workers == 1 or n_frames <= 1:
+        for i in range(n_frames):
+            _gen_one(i, out_dir, base_seed)
+        return
+    
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        # list() so worker exceptions are raised here
+        list(executor.map(_gen_one, range(n_frames), [out_dir] * n_frames, [base_seed] * n_frames))
@@ -3,6 +3,7 @@
 # Role: Junior Developer
 # Purpose: Independent Research Study
 
+import os
 import numpy as np
 from ..core.types import FrameData, MaskData, FrameQuality
 
@@ -11,7 +12,8 @@ def compute_frame_metrics(frame: FrameData, mask_data: MaskData) -> FrameQuality
     Computes metrics for a single frame based on the detection mask.
     """
     total_pixels = frame.data.size
-    affected_pixels = np.sum(mask_data.mask > 0)
+    # Masks are uint8 0/1 (FITS has no boolean pixels), so nonzero == streak
+    affected_pixels = int(np.count_nonzero(mask_data.mask))
     streak_area_fraction = affected_pixels / total_pixels if total_pixels > 0 else 0.0
     
     num_streaks = mask_data.meta.get("detected_lines", 0)
@@ -35,5 +37,3 @@ def compute_frame_metrics(frame: FrameData, mask_data: MaskData) -> FrameQuality
         flags=flags,
         detector_info=mask_data.meta
     )
-
-import os
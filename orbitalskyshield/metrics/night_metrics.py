@@ -3,15 +3,25 @@
 # Role: Junior Developer
 # Purpose: Independent Research Study
 
-from typing import List, Dict
+from typing import List, Dict, Union
 import numpy as np
-from ..core.types import FrameQuality, NightReport
+from ..core.types import FrameQuality, NightReport, QualityAccumulator
 
-def aggregate_night_metrics(qualities: List[FrameQuality], dataset_id: str) -> NightReport:
+def aggregate_night_metrics(
+    qualities: Union[QualityAccumulator, List[FrameQuality]],
+    dataset_id: str
+) -> NightReport:
     """
     Aggregates frame metrics into a night report.
+    
+    Works on the column arrays of a QualityAccumulator; a plain list of
+    FrameQuality is converted first.
     """
-    if not qualities:
+    if not isinstance(qualities, QualityAccumulator):
+        qualities = QualityAccumulator.from_qualities(qualities)
+    
+    n = qualities.n_frames
+    if n == 0:
         return NightReport(
             dataset_id=dataset_id,
             n_frames=0,
@@ -21,20 +31,23 @@ def aggregate_night_metrics(qualities: List[FrameQuality], dataset_id: str) -> N
             severity_histogram={}
         )
 
-    fractions = [q.streak_area_fraction for q in qualities]
-    affected_count = sum(1 for q in qualities if q.num_streaks > 0)
+    fractions = qualities.fractions[:n]
+    affected_count = int(np.count_nonzero(qualities.num_streaks[:n] > 0))
     
     # Histogram of severity
-    severities = [q.severity_score for q in qualities]
-    hist_counts, _ = np.histogram(severities, bins=[0, 0.2, 0.4, 0.6, 0.8, 1.01])
+    # Five equal-width bins on [0, 1]: quantize and count instead of np.histogram's
+    # edge search (severity 1.0 lands in the last bin, as with the old 1.01 edge)
+    severities = qualities.severities[:n]
+    bin_index = np.minimum((severities * 5).astype(np.intp), 4)
+    hist_counts = np.bincount(bin_index, minlength=5)
     hist_labels = ["0-0.2", "0.2-0.4", "0.4-0.6", "0.6-0.8", "0.8-1.0"]
     severity_histogram = dict(zip(hist_labels, hist_counts.tolist()))
 
     return NightReport(
         dataset_id=dataset_id,
-        n_frames=len(qualities),
+        n_frames=n,
         affected_frames=affected_count,
-        median_streak_area_fraction=float(np.median(fractions)),
-        p95_streak_area_fraction=float(np.percentile(fractions, 95)),
+        median_streak_area_fraction=np.median(fractions),
+        p95_streak_area_fraction=np.percentile(fractions, 95),
         severity_histogram=severity_histogram
     )
@@ -3,111 +3,283 @@
 # Role: Junior Developer
 # Purpose: Independent Research Study
 
-from typing import List, Dict, Any, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Sequence, Tuple
 import numpy as np
-from ..core.types import FrameData, MaskData
+from ..core.jit import HAS_NUMBA, njit, prange
 from ..core.logging import get_logger
 
 logger = get_logger()
 
-def estimate_background_robust(image: np.ndarray, mask: np.ndarray) -> float:
+# Observation context entries the physical sky model needs for a frame
+_MODEL_CONTEXT_KEYS = ('date', 'observer_lat', 'observer_lon', 'zenith_distance', 'altitude_m')
+
+
+@njit(cache=True)
+def _masked_median(image, mask, buf):
+    """Median of the unmasked pixels, gathered into buf instead of image[mask == 0]."""
+    img = image.ravel()
+    msk = mask.ravel()
+    
+    count = 0
+    for i in range(img.size):
+        if msk[i] == 0:
+            buf[count] = img[i]
+            count += 1
+    
+    if count == 0:
+        return np.nan
+    
+    # Numba's median is a quickselect, not a full sort
+    return np.median(buf[:count])
+
+
+def estimate_background_robust(image: np.ndarray, mask: np.ndarray,
+                               scratch: Optional[np.ndarray] = None) -> float:
     """
     Estimates background level using masked median.
+    
+    Args:
+        image: Frame data (may be a memory-mapped array, see read_fits)
+        mask: Streak mask, non-zero pixels are excluded; None uses every pixel
+        scratch: Optional reusable 1-D buffer with at least image.size elements
+                 of the image's (native) dtype. The unmasked pixels are gathered
+                 into it and partitioned in place, so streaming many frames does
+                 not allocate a new pixel array per frame.
     """
+    dtype = image.dtype.newbyteorder('=')
+    if scratch is None or scratch.dtype != dtype or scratch.size < image.size:
+        scratch = np.empty(image.size, dtype=dtype)
+    
     if mask is None:
-        valid_pixels = image
+        # The caller's image must not be reordered: copy it into the buffer
+        valid_pixels = scratch[:image.size]
+        np.copyto(valid_pixels.reshape(image.shape), image)
+    elif HAS_NUMBA and image.dtype.isnative and image.shape == mask.shape:
+        return float(_masked_median(np.ascontiguousarray(image), np.ascontiguousarray(mask), scratch))
     else:
-        valid_pixels = image[mask == 0]
+        keep = (mask == 0).ravel()
+        valid_pixels = np.compress(keep, image.ravel(), out=scratch[:np.count_nonzero(keep)])
     
     if valid_pixels.size == 0:
         return np.nan
+    
+    # The buffer is ours, so the median may reorder it instead of copying.
+    # np.median selects with np.partition (introselect), it never fully sorts.
+    return float(np.median(valid_pixels, overwrite_input=True))
+
+
+def _percentiles_and_median(values: np.ndarray, percentiles: Sequence[float],
+                            overwrite_input: bool = False) -> Tuple[list, Any]:
+    """
+    np.percentile(values, p) for each p and np.median(values), along the last axis.
+    
+    One np.partition over every order statistic involved instead of one
+    selection per call. Interpolation and midpoint use NumPy's formulas
+    ('linear' method, mean of the middle pair), so the results are identical.
+    
+    Args:
+        values: Array with at least one element along the last axis (no NaN)
+        percentiles: Percentiles in [0, 100]
+        overwrite_input: Partition values in place instead of a copy
+    
+    Returns:
+        ([percentile for each p], median)
+    """
+    n = values.shape[-1]
+    mid = n // 2
+    kth = {mid, max(mid - 1, 0)}
+    bounds = []
+    for p in percentiles:
+        v = (n - 1) * (p / 100)
+        lo = int(np.floor(v))
+        hi = min(lo + 1, n - 1)
+        kth.update((lo, hi))
+        bounds.append((lo, hi, v - lo))
+    
+    kth = sorted(kth)
+    if overwrite_input:
+        values.partition(kth, axis=-1)
+        s = values
+    else:
+        s = np.partition(values, kth, axis=-1)
+    
+    results = []
+    for lo, hi, t in bounds:
+        a, b = s[..., lo], s[..., hi]
+        diff = b - a
+        results.append((b - diff * (1 - t) if t >= 0.5 else a + diff * t)[()])
+    
+    median = s[..., mid] if n % 2 else (s[..., mid - 1] + s[..., mid]) / 2
+    return results, median[()]
+
+
+@njit(parallel=True, cache=True)
+def _bootstrap_odc_kernel(bg_array, idx):
+    """
+    Numba version of _resampled_odc_percents for resamples given as index rows.
+    
+    Percentile and median come from two quickselects per row and use NumPy's
+    linear interpolation and midpoint formulas, so the result matches the
+    NumPy path exactly.
+    """
+    n_resamples, n = idx.shape
+    out = np.empty(n_resamples)
+    
+    # np.percentile(..., 5) 'linear' method: virtual index and weight
+    v = 0.05 * (n - 1)
+    lo = int(np.floor(v))
+    t = v - lo
+    hi = min(lo + 1, n - 1)
+    mid = n // 2
+    
+    for b in prange(n_resamples):
+        s = np.empty(n)
+        for j in range(n):
+            s[j] = bg_array[idx[b, j]]
+        
+        s = np.partition(s, lo)
+        a_lo = s[lo]
+        a_hi = np.min(s[lo + 1:]) if hi > lo else a_lo
+        diff = a_hi - a_lo
+        b_line = a_hi - diff * (1 - t) if t >= 0.5 else a_lo + diff * t
         
-    return float(np.median(valid_pixels))
+        s = np.partition(s, mid)
+        c_med = s[mid] if n % 2 else (np.max(s[:mid]) + s[mid]) / 2
+        
+        excess = max(0.0, c_med - b_line)
+        out[b] = excess / b_line * 100 if b_line > 0 else 0.0
+    return out
+
+
+def _resampled_odc_percents(samples: np.ndarray) -> np.ndarray:
+    """Simple-method ODC percent of each bootstrap resample (one per row); reorders samples in place."""
+    # samples is a private temporary: one partition, in place, for both statistics
+    (b_lines,), c_meds = _percentiles_and_median(samples, [5], overwrite_input=True)
+    excess = np.maximum(0, c_meds - b_lines)
+    return np.divide(excess, b_lines, out=np.zeros_like(excess), where=b_lines > 0) * 100
+
 
 class ODCEstimator:
-    def __init__(self, bootstrap_samples: int = 100, use_physical_model: bool = True):
+    def __init__(self, bootstrap_samples: int = 100, use_physical_model: bool = True,
+                 n_jobs: Optional[int] = 1, seed: int = 42):
+        """
+        Args:
+            bootstrap_samples: Resamples for the ODC confidence interval
+            use_physical_model: Use the sky brightness model when metadata allows
+            n_jobs: Threads for the NumPy bootstrap reductions (None = all cores);
+                    the Numba kernel uses Numba's own thread pool instead
+            seed: Seed of the bootstrap generator, created once per estimator;
+                  successive estimate() calls continue its stream
+        """
         self.bootstrap_samples = bootstrap_samples
         self.use_physical_model = use_physical_model
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
 
-    def estimate(self, frames: List[FrameData], masks: List[MaskData]) -> Dict[str, Any]:
+    def estimate(self, backgrounds: Sequence[float], paths: Optional[Sequence[str]] = None) -> Dict[str, Any]:
         """
         Estimates the Orbital Diffuse Contribution (ODC) for a set of frames.
         
-        Enhanced version uses physical sky brightness model when metadata available.
+        Enhanced version uses physical sky brightness model when metadata available
+        (evaluated for every such frame, the frame with the median natural sky is reported).
         Falls back to simple percentile method if no metadata.
         
+        Only the masked background level of each frame is needed (see
+        estimate_background_robust), so callers never have to keep the
+        images themselves in memory.
+        
         Args:
-            frames: List of FrameData objects
-            masks: List of MaskData objects (for masking streaks)
+            backgrounds: Background level of each frame (NaN for unusable frames)
+            paths: FITS path of each frame, used to read observation metadata
+                   for the physical model
         
         Returns:
             Dictionary with ODC estimate and components
         """
-        backgrounds = []
-        frames_with_metadata = []
+        if paths is None:
+            paths = [None] * len(backgrounds)
+        
+        valid_backgrounds = []
+        n_with_metadata = 0
+        # Physical model inputs of the frames with complete metadata, one column per field
+        md_dates, md_lats, md_lons, md_zds, md_alts = [], [], [], [], []
         
-        for f, m in zip(frames, masks):
-            bg = estimate_background_robust(f.data, m.mask)
+        for bg, path in zip(backgrounds, paths):
             if not np.isnan(bg):
-                backgrounds.append(bg)
+                valid_backgrounds.append(bg)
                 
                 # Try to get metadata for physical model
-                if self.use_physical_model:
+                if self.use_physical_model and path is not None:
                     try:
                         from ..core.fits_metadata import get_observation_context
-                        context = get_observation_context(f.path)
+                        context = get_observation_context(path)
                         if context['has_metadata'] and context['date']:
-                            frames_with_metadata.append({
-                                'background': bg,
-                                'context': context,
-                                'path': f.path
-                            })
+                            n_with_metadata += 1
+                            if all(context[k] is not None for k in _MODEL_CONTEXT_KEYS):
+                                md_dates.append(context['date'])
+                                md_lats.append(context['observer_lat'])
+                                md_lons.append(context['observer_lon'])
+                                md_zds.append(context['zenith_distance'])
+                                md_alts.append(context['altitude_m'])
                     except Exception as e:
-                        logger.debug(f"Could not extract metadata from {f.path}: {e}")
+                        logger.debug(f"Could not extract metadata from {path}: {e}")
         
+        backgrounds = valid_backgrounds
+
         if not backgrounds:
             return {"error": "No valid background data"}
             
         bg_array = np.array(backgrounds)
         
         # Method 1: Simple percentile baseline (always computed as fallback)
-        baseline = np.percentile(bg_array, 5)
-        current_median = np.median(bg_array)
+        # bg_array keeps its order (the bootstrap indexes into it): partition a copy
+        (baseline, bg_p95), current_median = _percentiles_and_median(bg_array, [5, 95])
         excess_simple = max(0, current_median - baseline)
         odc_percent_simple = (excess_simple / baseline * 100) if baseline > 0 else 0.0
         
         result = {
             'num_frames': len(backgrounds),
-            'odc_percent': float(odc_percent_simple),
-            'baseline_level': float(baseline),
-            'median_level': float(current_median),
+            'odc_percent': odc_percent_simple,
+            'baseline_level': baseline,
+            'median_level': current_median,
             'method': 'percentile_baseline'
         }
         
         # Method 2: Physical model (if metadata available)
-        if self.use_physical_model and len(frames_with_metadata) > 0:
+        if self.use_physical_model and n_with_metadata > 0:
             try:
                 from ..skyglow.physical_model import (
-                    natural_sky_brightness,
+                    natural_sky_brightness_batch,
                     estimate_odc_from_observed
                 )
                 
-                # Use first frame with good metadata as representative
-                representative = frames_with_metadata[0]
-                ctx = representative['context']
+                # Model every frame with usable metadata in one batch call
+                if not md_dates:
+                    raise ValueError("no frame has site coordinates and zenith distance")
                 
-                # Calculate natural sky brightness
-                natural_model = natural_sky_brightness(
-                    date=ctx['date'],
-                    observer_lat=ctx['observer_lat'],
-                    observer_lon=ctx['observer_lon'],
-                    zenith_distance=ctx['zenith_distance'],
-                    altitude_m=ctx['altitude_m']
+                batch = natural_sky_brightness_batch(
+                    dates=md_dates,
+                    observer_lats=np.asarray(md_lats, dtype=float),
+                    observer_lons=np.asarray(md_lons, dtype=float),
+                    zenith_distances=np.asarray(md_zds, dtype=float),
+                    altitudes_m=np.asarray(md_alts, dtype=float)
                 )
                 
+                # The observed level below is night-wide, so compare it with the
+                # frame whose natural sky is the night's median; all components and
+                # positions are taken from that one frame so they stay consistent
+                i = int(np.argsort(batch['total_sky_brightness'])[len(md_dates) // 2])
+                natural_model = {
+                    key: float(np.broadcast_to(values, (len(md_dates),))[i])
+                    for key, values in batch.items()
+                }
+                
                 # Convert background (ADU) to rough magnitude estimate
                 # Simplified conversion; proper calibration in Phase 4
-                bg_min, bg_max = np.percentile(bg_array, [5, 95])
+                bg_min, bg_max = baseline, bg_p95
                 if bg_max > bg_min:
                     normalized_bg = 22 - 4 * (current_median - bg_min) / (bg_max - bg_min)
                 else:
@@ -132,7 +304,8 @@ class ODCEstimator:
                         'sun_altitude': natural_model['sun_altitude']
                     },
                     'method': 'physical_model_with_percentile_fallback',
-                    'frames_with_metadata': len(frames_with_metadata)
+                    'frames_with_metadata': n_with_metadata,
+                    'frames_modeled': len(md_dates)
                 })
                 
                 logger.info(f"Physical ODC model: {odc_result['odc_percent_flux']:.2f}% flux increase")
@@ -141,19 +314,30 @@ class ODCEstimator:
                 logger.warning(f"Physical model failed, using percentile method: {e}")
         
         # Bootstrap for confidence intervals (on simple method)
-        if self.bootstrap_samples > 0:
-            rng = np.random.default_rng(42)
-            resampled_odcs = []
-            for _ in range(self.bootstrap_samples):
-                sample = rng.choice(bg_array, size=len(bg_array), replace=True)
-                b_line = np.percentile(sample, 5)
-                c_med = np.median(sample)
-                exc = max(0, c_med - b_line)
-                resampled_odcs.append((exc / b_line * 100) if b_line > 0 else 0.0)
+        if self.bootstrap_samples > 0 and np.ptp(bg_array) <= 1e-4 * max(abs(current_median), 1.0):
+            # (Nearly) constant sky: every resample's ODC is within 0.01 percentage
+            # points of the simple estimate, so skip resampling. The full range is
+            # tested, not the IQR, so a few outlying frames still get a bootstrap
+            result['odc_ci95'] = [odc_percent_simple, odc_percent_simple]
+        elif self.bootstrap_samples > 0:
+            # Draw all resamples at once as a (B, N) matrix and reduce along axis 1
+            # (same index stream as B successive rng.choice calls)
+            n = len(bg_array)
+            idx = self._rng.integers(0, n, size=(self.bootstrap_samples, n))
+            
+            if HAS_NUMBA and bg_array.dtype == np.float64:
+                resampled_odcs = _bootstrap_odc_kernel(bg_array, idx)
+            elif self.n_jobs > 1 and self.bootstrap_samples > 1:
+                # Indices are drawn once above, so the interval does not depend on
+                # n_jobs; threads only split the rows (NumPy releases the GIL)
+                chunks = np.array_split(bg_array[idx], min(self.n_jobs, self.bootstrap_samples))
+                with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                    resampled_odcs = np.concatenate(list(executor.map(_resampled_odc_percents, chunks)))
+            else:
+                resampled_odcs = _resampled_odc_percents(bg_array[idx])
             
-            ci95 = [float(np.percentile(resampled_odcs, 2.5)), 
-                   float(np.percentile(resampled_odcs, 97.5))]
-            result['odc_ci95'] = ci95
+            ci95 = np.percentile(resampled_odcs, [2.5, 97.5])
+            result['odc_ci95'] = [ci95[0], ci95[1]]
         else:
             result['odc_ci95'] = [0.0, 0.0]
 
@@ -17,27 +17,45 @@ This allows ODC (Orbital Diffuse Contribution) to be calculated as
 the residual between observed and modeled natural sky brightness.
 """
 
+import functools
 import numpy as np
-from typing import Dict, Optional
-from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple, Union
+from datetime import datetime, timedelta
 import ephem  # PyEphem for astronomical calculations
 
 from ..core.logging import get_logger
 
 logger = get_logger()
 
+# Scalar or per-frame array; the brightness models accept either
+ArrayLike = Union[float, np.ndarray]
 
-def lunar_phase_angle(date: datetime, observer_lat: float, observer_lon: float) -> float:
+# Magnitude <-> flux conversions folded into natural exp/log:
+# 10**(-0.4 * m) == exp(_MAG_TO_LN * m) and -2.5 * log10(f) == _LN_TO_MAG * log(f)
+_LN10 = np.log(10.0)
+_MAG_TO_LN = -0.4 * _LN10
+_LN_TO_MAG = -2.5 / _LN10
+
+# Constant factors of the Krisciunas & Schaefer lunar model
+_I_STAR_ZERO = 10**(-0.4 * 3.84)
+_F_RHO_SCALE = 10**5.36
+
+
+def _ephem_key(date: datetime) -> datetime:
+    """Rounds date to the nearest second so nearby lookups share a cache entry."""
+    return (date + timedelta(microseconds=500000)).replace(microsecond=0)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compute_bodies(date: datetime, observer_lat: float, observer_lon: float) -> Tuple[float, float, float]:
     """
-    Calculate lunar phase angle for given date and location.
+    Moon altitude, lunar phase angle and Sun altitude for one site and time.
     
-    Args:
-        date: Observation datetime (UTC)
-        observer_lat: Observer latitude (degrees)
-        observer_lon: Observer longitude (degrees)
+    One Observer and one compute() per body, cached per (date, lat, lon);
+    callers pass the date through _ephem_key.
     
     Returns:
-        Phase angle in degrees (0=new, 180=full)
+        (moon_alt, moon_phase, sun_alt), angles in degrees
     """
     obs = ephem.Observer()
     obs.lat = str(observer_lat)
@@ -46,10 +64,27 @@ def lunar_phase_angle(date: datetime, observer_lat: float, observer_lon: float)
     
     moon = ephem.Moon()
     moon.compute(obs)
+    sun = ephem.Sun()
+    sun.compute(obs)
     
     # Phase angle (0-180 degrees)
-    phase_angle = float(moon.moon_phase) * 180.0
-    return phase_angle
+    moon_phase = float(moon.moon_phase) * 180.0
+    return np.degrees(float(moon.alt)), moon_phase, np.degrees(float(sun.alt))
+
+
+def lunar_phase_angle(date: datetime, observer_lat: float, observer_lon: float) -> float:
+    """
+    Calculate lunar phase angle for given date and location.
+    
+    Args:
+        date: Observation datetime (UTC)
+        observer_lat: Observer latitude (degrees)
+        observer_lon: Observer longitude (degrees)
+    
+    Returns:
+        Phase angle in degrees (0=new, 180=full)
+    """
+    return _compute_bodies(_ephem_key(date), observer_lat, observer_lon)[1]
 
 
 def lunar_altitude(date: datetime, observer_lat: float, observer_lon: float) -> float:
@@ -64,15 +99,7 @@ def lunar_altitude(date: datetime, observer_lat: float, observer_lon: float) ->
     Returns:
         Altitude in degrees (negative if below horizon)
     """
-    obs = ephem.Observer()
-    obs.lat = str(observer_lat)
-    obs.lon = str(observer_lon)
-    obs.date = date
-    
-    moon = ephem.Moon()
-    moon.compute(obs)
-    
-    return np.degrees(float(moon.alt))
+    return _compute_bodies(_ephem_key(date), observer_lat, observer_lon)[0]
 
 
 def sun_altitude(date: datetime, observer_lat: float, observer_lon: float) -> float:
@@ -87,27 +114,20 @@ def sun_altitude(date: datetime, observer_lat: float, observer_lon: float) -> fl
     Returns:
         Altitude in degrees (negative if below horizon)
     """
-    obs = ephem.Observer()
-    obs.lat = str(observer_lat)
-    obs.lon = str(observer_lon)
-    obs.date = date
-    
-    sun = ephem.Sun()
-    sun.compute(obs)
-    
-    return np.degrees(float(sun.alt))
+    return _compute_bodies(_ephem_key(date), observer_lat, observer_lon)[2]
 
 
 def krisciunas_schaefer_lunar_brightness(
-    moon_altitude: float,
-    moon_phase_angle: float,
-    zenith_distance: float,
+    moon_altitude: ArrayLike,
+    moon_phase_angle: ArrayLike,
+    zenith_distance: ArrayLike,
     extinction: float = 0.25
-) -> float:
+) -> ArrayLike:
     """
     Calculate lunar sky brightness contribution.
     
-    Based on Krisciunas & Schaefer (1991) model.
+    Based on Krisciunas & Schaefer (1991) model. Accepts scalars or arrays
+    (broadcast together, one value per frame).
     
     Args:
         moon_altitude: Moon altitude in degrees
@@ -118,89 +138,148 @@ def krisciunas_schaefer_lunar_brightness(
     Returns:
         Sky brightness in mag/arcsec² (V-band equivalent)
     """
-    if moon_altitude < -10:
-        # Moon well below horizon, no contribution
-        return 22.0  # Dark sky value
+    moon_altitude = np.asarray(moon_altitude, dtype=float)
     
     # Convert to radians
     rho = np.radians(zenith_distance)
     alpha = np.radians(moon_phase_angle)
     h_moon = np.radians(moon_altitude)
     
-    # Lunar illuminance function (Krisciunas & Schaefer eq. 20-21)
-    I_star = 10**(-0.4 * (3.84 + 0.026 * np.abs(alpha) + 4e-9 * alpha**4))
-    
-    # Airmass for moon
-    X_moon = 1.0 / (np.sin(h_moon) + 0.025 * np.exp(-11 * np.sin(h_moon)))
-    
-    # Scattering function
-    f_rho = 10**5.36 * (1.06 + np.cos(rho)**2)
-    
-    # Moon brightness contribution
-    B_moon = f_rho * I_star * 10**(-0.4 * extinction * X_moon) * (1 - 10**(-0.4 * extinction * 1/np.cos(rho)))
-    
-    # Convert to magnitude
-    if B_moon > 0:
-        m_moon = -2.5 * np.log10(B_moon) + 21.58  # Calibration constant
-    else:
-        m_moon = 22.0
-    
-    return m_moon
+    # Evaluated for every frame, including those with the Moon far below the
+    # horizon (replaced by the dark sky value below), so silence their overflows
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        # Lunar illuminance function (Krisciunas & Schaefer eq. 20-21)
+        I_star = _I_STAR_ZERO * np.exp(_MAG_TO_LN * (0.026 * np.abs(alpha) + 4e-9 * alpha**4))
+        
+        # Airmass for moon
+        X_moon = 1.0 / (np.sin(h_moon) + 0.025 * np.exp(-11 * np.sin(h_moon)))
+        
+        # Scattering function
+        f_rho = _F_RHO_SCALE * (1.06 + np.cos(rho)**2)
+        
+        # Moon brightness contribution
+        B_moon = (
+            f_rho * I_star * np.exp(_MAG_TO_LN * extinction * X_moon)
+            * -np.expm1(_MAG_TO_LN * extinction / np.cos(rho))
+        )
+        
+        # Convert to magnitude (calibration constant 21.58), dark sky if no flux
+        m_moon = np.where(B_moon > 0, _LN_TO_MAG * np.log(B_moon) + 21.58, 22.0)
+        
+    # Moon well below horizon, no contribution: dark sky value
+    m_moon = np.where(moon_altitude < -10, 22.0, m_moon)
+    return m_moon[()]
 
 
 def rayleigh_scattering_brightness(
-    zenith_distance: float,
-    altitude_m: float = 2400.0
-) -> float:
+    zenith_distance: ArrayLike,
+    altitude_m: ArrayLike = 2400.0
+) -> ArrayLike:
     """
     Calculate Rayleigh scattering contribution (natural airglow).
     
     Args:
-        zenith_distance: Zenith distance in degrees
-        altitude_m: Observatory altitude in meters
+        zenith_distance: Zenith distance in degrees (scalar or array)
+        altitude_m: Observatory altitude in meters (scalar or array)
     
     Returns:
         Sky brightness in mag/arcsec²
     """
-    # Airmass calculation
+    # Airmass calculation (fixed at 5 beyond 70 degrees)
     z_rad = np.radians(zenith_distance)
-    airmass = 1.0 / np.cos(z_rad) if z_rad < np.radians(70) else 5.0
+    airmass = np.where(z_rad < np.radians(70), 1.0 / np.cos(z_rad), 5.0)
     
-    # Altitude correction (pressure reduces with altitude)
-    pressure_ratio = np.exp(-altitude_m / 8000.0)  # Scale height ~8km
+    # Altitude correction (pressure reduces with altitude, scale height ~8km):
+    # pressure_ratio = exp(-altitude_m / 8000), applied below in log space
+    # as -2.5 * log10(pressure_ratio) = altitude_m * 2.5 / (8000 * ln 10)
+    altitude_term = np.asarray(altitude_m, dtype=float) * (-_LN_TO_MAG / 8000.0)
     
     # Rayleigh baseline at zenith (mag/arcsec²)
     # Typical dark site: ~22 mag/arcsec² at zenith
     rayleigh_zenith = 22.0
     
     # Airmass dependence (gets brighter near horizon)
-    rayleigh_sky = rayleigh_zenith - 2.5 * np.log10(airmass * pressure_ratio)
+    rayleigh_sky = rayleigh_zenith + _LN_TO_MAG * np.log(airmass) + altitude_term
     
-    return rayleigh_sky
+    return rayleigh_sky[()]
 
 
-def twilight_brightness(sun_altitude: float) -> float:
+def twilight_brightness(sun_altitude: ArrayLike) -> ArrayLike:
     """
     Calculate twilight contribution to sky brightness.
     
     Args:
-        sun_altitude: Sun altitude in degrees (negative = below horizon)
+        sun_altitude: Sun altitude in degrees (negative = below horizon),
+                      scalar or array
     
     Returns:
         Sky brightness in mag/arcsec² (very bright if sun is up)
     """
-    if sun_altitude > -6:
-        # Civil twilight or brighter
-        return 10.0  # Very bright
-    elif sun_altitude > -12:
-        # Nautical twilight
-        return 16.0
-    elif sun_altitude > -18:
-        # Astronomical twilight
-        return 19.0
+    sun_altitude = np.asarray(sun_altitude, dtype=float)
+    brightness = np.select(
+        [
+            sun_altitude > -6,   # Civil twilight or brighter: very bright
+            sun_altitude > -12,  # Nautical twilight
+            sun_altitude > -18,  # Astronomical twilight
+        ],
+        [10.0, 16.0, 19.0],
+        default=22.0             # Dark sky, no twilight contribution
+    )
+    return brightness[()]
+
+
+def _is_dark_sky(moon_alt: ArrayLike, sun_alt: ArrayLike) -> bool:
+    """
+    True if, for every frame, the Moon is well below the horizon and the Sun
+    is past astronomical twilight: both components are then the 22 mag floor.
+    """
+    return bool(np.all((np.asarray(moon_alt) < -10) & (np.asarray(sun_alt) < -18)))
+
+
+def _sky_brightness_components(
+    moon_alt: ArrayLike,
+    moon_phase: ArrayLike,
+    sun_alt: ArrayLike,
+    zenith_distance: ArrayLike,
+    altitude_m: ArrayLike,
+    extinction: float,
+    dark: bool = False
+) -> Dict[str, ArrayLike]:
+    """
+    Combines the model components; shared by the scalar and batch entry points.
+    
+    With dark=True (see _is_dark_sky) the lunar and twilight models are not
+    evaluated, their known 22 mag/arcsec² floor is used directly.
+    """
+    # Individual components
+    if dark:
+        lunar_contrib = np.full(np.broadcast(moon_alt, moon_phase, zenith_distance).shape, 22.0)[()]
+        twilight_contrib = np.full(np.shape(sun_alt), 22.0)[()]
     else:
-        # Dark sky
-        return 22.0  # No twilight contribution
+        lunar_contrib = krisciunas_schaefer_lunar_brightness(
+            moon_alt, moon_phase, zenith_distance, extinction
+        )
+        twilight_contrib = twilight_brightness(sun_alt)
+    
+    rayleigh_contrib = rayleigh_scattering_brightness(zenith_distance, altitude_m)
+    
+    # Combine contributions (in flux space, then convert to mag)
+    # mag -> flux: flux = 10^(-0.4 * mag)
+    flux_lunar = np.exp(_MAG_TO_LN * lunar_contrib)
+    flux_rayleigh = np.exp(_MAG_TO_LN * rayleigh_contrib)
+    flux_twilight = np.exp(_MAG_TO_LN * twilight_contrib)
+    
+    total_flux = flux_lunar + flux_rayleigh + flux_twilight
+    
+    # flux -> mag: mag = -2.5 * log10(flux)
+    total_sky_brightness = _LN_TO_MAG * np.log(total_flux)
+    
+    return {
+        'total_sky_brightness': total_sky_brightness,
+        'lunar_component': lunar_contrib,
+        'rayleigh_component': rayleigh_contrib,
+        'twilight_component': twilight_contrib,
+    }
 
 
 def natural_sky_brightness(
@@ -227,44 +306,79 @@ def natural_sky_brightness(
     Returns:
         Dictionary with components and total sky brightness
     """
-    # Calculate celestial positions
-    moon_alt = lunar_altitude(date, observer_lat, observer_lon)
-    moon_phase = lunar_phase_angle(date, observer_lat, observer_lon)
-    sun_alt = sun_altitude(date, observer_lat, observer_lon)
+    # Calculate celestial positions (one cached ephem pass for all three)
+    moon_alt, moon_phase, sun_alt = _compute_bodies(_ephem_key(date), observer_lat, observer_lon)
     
-    # Individual components
-    lunar_contrib = krisciunas_schaefer_lunar_brightness(
-        moon_alt, moon_phase, zenith_distance, extinction
+    # Dark sky (no Moon, no twilight): skip the lunar and twilight models
+    shortcut = _is_dark_sky(moon_alt, sun_alt)
+    components = _sky_brightness_components(
+        moon_alt, moon_phase, sun_alt, zenith_distance, altitude_m, extinction, dark=shortcut
     )
     
-    rayleigh_contrib = rayleigh_scattering_brightness(zenith_distance, altitude_m)
-    
-    twilight_contrib = twilight_brightness(sun_alt)
-    
-    # Combine contributions (in flux space, then convert to mag)
-    # mag -> flux: flux = 10^(-0.4 * mag)
-    flux_lunar = 10**(-0.4 * lunar_contrib)
-    flux_rayleigh = 10**(-0.4 * rayleigh_contrib)
-    flux_twilight = 10**(-0.4 * twilight_contrib)
-    
-    total_flux = flux_lunar + flux_rayleigh + flux_twilight
-    
-    # flux -> mag
-    total_sky_brightness = -2.5 * np.log10(total_flux)
-    
     return {
-        'total_sky_brightness': float(total_sky_brightness),
-        'lunar_component': float(lunar_contrib),
-        'rayleigh_component': float(rayleigh_contrib),
-        'twilight_component': float(twilight_contrib),
+        'total_sky_brightness': float(components['total_sky_brightness']),
+        'lunar_component': float(components['lunar_component']),
+        'rayleigh_component': float(components['rayleigh_component']),
+        'twilight_component': float(components['twilight_component']),
         'moon_altitude': float(moon_alt),
         'moon_phase_angle': float(moon_phase),
         'sun_altitude': float(sun_alt),
         'zenith_distance': float(zenith_distance),
+        'shortcut': shortcut,
         'model_version': 'v1.0_krisciunas_schaefer'
     }
 
 
+def natural_sky_brightness_batch(
+    dates: Sequence[datetime],
+    observer_lats: ArrayLike,
+    observer_lons: ArrayLike,
+    zenith_distances: ArrayLike,
+    altitudes_m: ArrayLike = 2400.0,
+    extinction: float = 0.25
+) -> Dict[str, np.ndarray]:
+    """
+    natural_sky_brightness for many frames at once.
+    
+    Only the Moon/Sun positions are computed per frame (ephem is scalar, and
+    cached per site and second); the brightness model itself runs as array
+    operations over all frames.
+    
+    Args:
+        dates: Observation datetime (UTC) of each frame
+        observer_lats: Observer latitude (degrees), per frame or scalar
+        observer_lons: Observer longitude (degrees), per frame or scalar
+        zenith_distances: Pointing zenith distance (degrees), per frame or scalar
+        altitudes_m: Observatory altitude (meters above sea level), per frame or scalar
+        extinction: Atmospheric extinction coefficient
+    
+    Returns:
+        Same keys as natural_sky_brightness, each an array with one value per frame
+    """
+    n = len(dates)
+    lats = np.broadcast_to(np.asarray(observer_lats, dtype=float), (n,))
+    lons = np.broadcast_to(np.asarray(observer_lons, dtype=float), (n,))
+    zenith_distances = np.broadcast_to(np.asarray(zenith_distances, dtype=float), (n,))
+    
+    bodies = np.array([
+        _compute_bodies(_ephem_key(date), lat, lon)
+        for date, lat, lon in zip(dates, lats.tolist(), lons.tolist())
+    ], dtype=float).reshape(n, 3)
+    moon_alt, moon_phase, sun_alt = bodies.T
+    
+    components = _sky_brightness_components(
+        moon_alt, moon_phase, sun_alt, zenith_distances, altitudes_m, extinction,
+        dark=_is_dark_sky(moon_alt, sun_alt)
+    )
+    components.update({
+        'moon_altitude': moon_alt,
+        'moon_phase_angle': moon_phase,
+        'sun_altitude': sun_alt,
+        'zenith_distance': zenith_distances,
+    })
+    return components
+
+
 def estimate_odc_from_observed(
     observed_sky_brightness: float,
     natural_model: Dict[str, float]
@@ -7,26 +7,41 @@ import numpy as np
 from typing import Tuple
 from skimage.transform import hough_line, hough_line_peaks
 from skimage.feature import canny
+from skimage.util import img_as_float32
 from skimage.morphology import dilation, square
+from .line_raster import draw_line_band
 from ..core.types import MaskData
 from ..core.logging import get_logger
 
 logger = get_logger()
 
 class BaselineDetector:
-    def __init__(self, threshold_sigma: float = 5.0, line_width: int = 3):
+    def __init__(self, threshold_sigma: float = 5.0, line_width: int = 3,
+                 theta_resolution_deg: float = 1.0):
         self.threshold_sigma = threshold_sigma
         self.line_width = line_width
+        self.theta_resolution_deg = theta_resolution_deg
+        # Hough angles over [-90, 90) degrees; 1 degree = skimage's default 180 bins.
+        # Hough cost scales with the number of angles
+        n_theta = max(1, int(round(180.0 / theta_resolution_deg)))
+        self._theta = np.linspace(-np.pi / 2, np.pi / 2, n_theta, endpoint=False)
 
     def detect(self, image: np.ndarray) -> MaskData:
         """
         Detects streaks in the image.
         Returns a MaskData object.
         """
-        # 1. Simple Sigma Clipping to find bright features
-        mean, std = np.mean(image), np.std(image)
-        threshold = mean + self.threshold_sigma * std
-        binary = image > threshold
+        # Work in float32: half the memory traffic of float64 for every stage.
+        # Integer images are scaled to [0, 1] exactly as skimage would do itself.
+        image = img_as_float32(image)
+
+        # 1. Background statistics for the edge thresholds, from one pass of
+        # float64 sums instead of separate mean and std reductions
+        n = image.size
+        total = image.sum(dtype=np.float64)
+        total_sq = np.square(image, dtype=np.float64).sum()
+        mean = total / n
+        std = np.sqrt(max(total_sq / n - mean * mean, 0.0))
         
         # 2. Canny Edge Detection to focus on edges (optional, but helps Hough)
         # For simplicity in MVP, we might just run Hough on the binary mask of bright objects
@@ -35,7 +50,7 @@ class BaselineDetector:
         
         # 3. Hough Transform to find lines
         # tested_angles = np.linspace(-np.pi / 2, np.pi / 2, 360, endpoint=False)
-        h, theta, d = hough_line(edges)
+        h, theta, d = hough_line(edges, theta=self._theta)
         
         mask = np.zeros(image.shape, dtype=np.uint8)
         num_streaks = 0 
@@ -50,17 +65,10 @@ class BaselineDetector:
             
             # Reconstruct lines
             for _, angle, dist in zip(accum, angles, dists):
-                y0 = (dist - 0 * np.cos(angle)) / np.sin(angle)
-                y1 = (dist - image.shape[1] * np.cos(angle)) / np.sin(angle)
-                
-                # Draw line on mask
-                # using a fast way: check distance of all pixels to the line
-                # distance = |x*cos(theta) + y*sin(theta) - rho|
-                y_indices, x_indices = np.indices(image.shape)
-                distance_map = np.abs(x_indices * np.cos(angle) + y_indices * np.sin(angle) - dist)
-                
-                # Mask pixels within line_width/2
-                mask[distance_map < self.line_width] = 1
+                # Draw line on mask: pixels with
+                # distance = |x*cos(theta) + y*sin(theta) - rho| < line_width,
+                # testing only the pixels along the line
+                draw_line_band(mask, angle, dist, self.line_width)
 
         # 5. Metadata
         meta = {
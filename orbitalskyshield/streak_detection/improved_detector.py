@@ -14,20 +14,75 @@ This detector combines multiple techniques:
 """
 
 import numpy as np
-from typing import Tuple, List
+from typing import Optional, Tuple, List
 from scipy import ndimage
 from skimage.transform import hough_line, hough_line_peaks, radon
 from skimage.feature import canny
 from skimage.morphology import dilation, erosion, rectangle, remove_small_objects
-from skimage.filters import threshold_local, gaussian
-from skimage.measure import label, regionprops
+from skimage.filters import threshold_local
+from skimage.util import img_as_float32
+from skimage.measure import label, regionprops_table
 
+from .line_raster import draw_line_band
 from ..core.types import MaskData
 from ..core.logging import get_logger
 
 logger = get_logger()
 
 
+def _region_shapes(labeled: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Label, area and ellipse axis lengths of every region, as column arrays.
+    
+    One regionprops_table call instead of lazily evaluated RegionProperties
+    objects read one attribute at a time in a Python loop.
+    
+    Returns:
+        (labels, area, major_axis_length, minor_axis_length)
+    """
+    props = regionprops_table(
+        labeled, properties=('label', 'area', 'axis_major_length', 'axis_minor_length')
+    )
+    return props['label'], props['area'], props['axis_major_length'], props['axis_minor_length']
+
+
+def _aspect_ratios(major: np.ndarray, minor: np.ndarray) -> np.ndarray:
+    """major/minor per region; 0 where the minor axis is degenerate (never kept)."""
+    return np.divide(major, minor, out=np.zeros_like(major), where=minor > 0)
+
+
+def _regions_mask(labeled: np.ndarray, keep_labels: np.ndarray, dtype=bool,
+                  out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Mask of the pixels belonging to keep_labels, via a label lookup table."""
+    lut = np.zeros(labeled.max() + 1, dtype=dtype)
+    lut[keep_labels] = 1
+    if out is None:
+        return lut[labeled]
+    # Labels are always in range; 'clip' lets take write straight into out
+    return np.take(lut, labeled, out=out, mode='clip')
+
+
+def _smooth_into(image: np.ndarray, sigma: float, buf: np.ndarray) -> np.ndarray:
+    """
+    Gaussian smoothing of a float32 image written into a reusable buffer.
+    
+    Same result as skimage's gaussian (mode='nearest', truncate=4), without
+    allocating a new output array per frame.
+    
+    Args:
+        image: float32 image.
+        sigma: Gaussian standard deviation in pixels.
+        buf: Previous output buffer, or None; replaced if the shape differs.
+    
+    Returns:
+        The smoothed image (buf, or a newly allocated buffer).
+    """
+    if buf is None or buf.shape != image.shape:
+        buf = np.empty(image.shape, dtype=np.float32)
+    ndimage.gaussian_filter(image, sigma=sigma, output=buf, mode='nearest', truncate=4.0)
+    return buf
+
+
 class ImprovedDetector:
     """
     Improved streak detector using multiple approaches.
@@ -44,12 +99,18 @@ class ImprovedDetector:
         threshold_sigma: float = 3.0,
         min_streak_length: int = 30,
         min_aspect_ratio: float = 3.0,
-        use_radon: bool = False
+        use_radon: bool = False,
+        theta_resolution_deg: float = 1.0
     ):
         self.threshold_sigma = threshold_sigma
         self.min_streak_length = min_streak_length
         self.min_aspect_ratio = min_aspect_ratio
         self.use_radon = use_radon
+        self.theta_resolution_deg = theta_resolution_deg
+        # Hough angles over [-90, 90) degrees; 1 degree = skimage's default 180 bins
+        n_theta = max(1, int(round(180.0 / theta_resolution_deg)))
+        self._theta = np.linspace(-np.pi / 2, np.pi / 2, n_theta, endpoint=False)
+        self._smooth_buf = None  # reused across frames of the same shape
     
     def detect(self, image: np.ndarray) -> MaskData:
         """
@@ -62,7 +123,9 @@ class ImprovedDetector:
             MaskData with detected mask and metadata
         """
         # Stage 1: Preprocessing and adaptive thresholding
-        smoothed = gaussian(image, sigma=1.0)
+        # (in float32; integer images are scaled to [0, 1] as gaussian would)
+        image = img_as_float32(image)
+        smoothed = self._smooth_buf = _smooth_into(image, 1.0, self._smooth_buf)
         
         # Adaptive local thresholding (better for varying backgrounds)
         local_thresh = threshold_local(smoothed, block_size=51, offset=-5)
@@ -74,23 +137,16 @@ class ImprovedDetector:
         
         # Identify connected components
         labeled = label(bright_features)
-        regions = regionprops(labeled)
+        labels, _, major, minor = _region_shapes(labeled)
         
-        # Filter by elongation
-        elongated_mask = np.zeros_like(image, dtype=bool)
-        num_candidate_streaks = 0
-        
-        for region in regions:
-            # Calculate aspect ratio
-            if region.minor_axis_length > 0:
-                aspect_ratio = region.major_axis_length / region.minor_axis_length
-                
-                # Check if elongated enough
-                if aspect_ratio >= self.min_aspect_ratio and region.major_axis_length >= self.min_streak_length:
-                    # Add this region to mask
-                    coords = region.coords
-                    elongated_mask[coords[:, 0], coords[:, 1]] = True
-                    num_candidate_streaks += 1
+        # Filter by elongation (aspect ratio and length)
+        keep = (
+            (minor > 0)
+            & (_aspect_ratios(major, minor) >= self.min_aspect_ratio)
+            & (major >= self.min_streak_length)
+        )
+        elongated_mask = _regions_mask(labeled, labels[keep])
+        num_candidate_streaks = int(np.count_nonzero(keep))
         
         # Stage 3: Refine with edge detection + Hough
         edges = canny(smoothed, sigma=1.5, low_threshold=0.1, high_threshold=0.2)
@@ -104,7 +160,7 @@ class ImprovedDetector:
         
         if edges_filtered.any():
             try:
-                h, theta, d = hough_line(edges_filtered)
+                h, theta, d = hough_line(edges_filtered, theta=self._theta)
                 
                 if h.max() > 0:
                     # Lower threshold for detection
@@ -115,14 +171,8 @@ class ImprovedDetector:
                     
                     # Draw detected lines
                     for _, angle, dist in zip(accum, angles, dists):
-                        y_indices, x_indices = np.indices(image.shape)
-                        distance_map = np.abs(
-                            x_indices * np.cos(angle) + 
-                            y_indices * np.sin(angle) - dist
-                        )
-                        
                         # Wider line width for better visibility
-                        final_mask[distance_map < 5] = 1
+                        draw_line_band(final_mask, angle, dist, 5)
             
             except Exception as e:
                 logger.warning(f"Hough transform failed: {e}")
@@ -160,15 +210,26 @@ class AdaptiveDetector:
         self.percentile_thresh = percentile_thresh
         self.min_streak_length = min_streak_length
         self.min_aspect_ratio = min_aspect_ratio
+        self._smooth_buf = None  # reused across frames of the same shape
     
-    def detect(self, image: np.ndarray) -> MaskData:
+    def detect(self, image: np.ndarray, out: Optional[np.ndarray] = None) -> MaskData:
         """
         Detect using simple percentile thresholding + morphology.
         
         Often works better than complex approaches for astronomical data.
+        
+        Args:
+            image: 2D image
+            out: Optional uint8 array of the image shape to write the mask
+                 into, for loops that only read each mask before the next
+                 call (it is overwritten every time)
         """
-        # Smooth to reduce noise
-        smoothed = gaussian(image, sigma=1.5)
+        if out is not None and (out.shape != image.shape or out.dtype != np.uint8):
+            raise ValueError(f"out must be a uint8 array of shape {image.shape}, got {out.dtype} {out.shape}")
+        
+        # Smooth to reduce noise (in float32, integer images scaled as gaussian would)
+        image = img_as_float32(image)
+        smoothed = self._smooth_buf = _smooth_into(image, 1.5, self._smooth_buf)
         
         # Percentile-based threshold (top N% brightest pixels)
         thresh_value = np.percentile(smoothed, self.percentile_thresh)
@@ -179,26 +240,16 @@ class AdaptiveDetector:
         
         # Find connected components
         labeled = label(bright_mask)
-        regions = regionprops(labeled)
+        labels, area, major, minor = _region_shapes(labeled)
         
-        # Filter by shape
-        streak_mask = np.zeros_like(image, dtype=np.uint8)
-        num_streaks = 0
-        
-        for region in regions:
-            # Skip small regions
-            if region.area < self.min_streak_length:
-                continue
-            
-            # Calculate aspect ratio
-            if region.minor_axis_length > 0:
-                aspect_ratio = region.major_axis_length / region.minor_axis_length
-                
-                if aspect_ratio >= self.min_aspect_ratio:
-                    # This looks like a streak
-                    coords = region.coords
-                    streak_mask[coords[:, 0], coords[:, 1]] = 1
-                    num_streaks += 1
+        # Filter by shape: skip small regions, keep elongated ones (streaks)
+        keep = (
+            (area >= self.min_streak_length)
+            & (minor > 0)
+            & (_aspect_ratios(major, minor) >= self.min_aspect_ratio)
+        )
+        streak_mask = _regions_mask(labeled, labels[keep], dtype=np.uint8, out=out)
+        num_streaks = int(np.count_nonzero(keep))
         
         meta = {
             "method": "AdaptiveDetector_Percentile",
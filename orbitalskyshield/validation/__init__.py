@@ -8,19 +8,27 @@
 from .metrics import (
     DetectionMetrics,
     parse_yolo_label,
+    pack_mask,
     compute_iou,
+    compute_iou_packed,
+    compute_box_ious,
     compute_pixel_metrics,
     evaluate_single_frame,
     aggregate_metrics,
+    OnlineAggregator,
     generate_validation_report
 )
 
 __all__ = [
     'DetectionMetrics',
     'parse_yolo_label',
+    'pack_mask',
     'compute_iou',
+    'compute_iou_packed',
+    'compute_box_ious',
     'compute_pixel_metrics',
     'evaluate_single_frame',
     'aggregate_metrics',
+    'OnlineAggregator',
     'generate_validation_report'
 ]
@@ -11,15 +11,23 @@ datasets with labeled ground truth (e.g., YOLO format).
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional, Union
 from pathlib import Path
 from dataclasses import dataclass
-import json
+from operator import attrgetter
 
+from ..core.io_json import write_json, write_json_rows
+from ..core.jit import HAS_NUMBA, njit, prange
 from ..core.logging import get_logger
 
 logger = get_logger()
 
+# DetectionMetrics fields listed per frame in the validation report
+_DETAIL_FIELDS = ('iou', 'precision', 'recall', 'f1_score', 'num_gt_streaks', 'num_pred_streaks')
+
+# Set-bit count of every byte value, for NumPy < 2.0 (no np.bitwise_count)
+_POPCOUNT_LUT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
 
 @dataclass
 class DetectionMetrics:
@@ -35,7 +43,8 @@ class DetectionMetrics:
     num_pred_streaks: int
 
 
-def parse_yolo_label(label_path: Path, image_shape: Tuple[int, int]) -> np.ndarray:
+def parse_yolo_label(label_path: Path, image_shape: Tuple[int, int],
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Parse YOLO format label file to binary mask.
     
@@ -44,47 +53,180 @@ def parse_yolo_label(label_path: Path, image_shape: Tuple[int, int]) -> np.ndarr
     Args:
         label_path: Path to .txt label file
         image_shape: (height, width) of the image
+        out: Optional uint8 (height, width) array to write the mask into,
+             so a validation loop can reuse one buffer across frames
     
     Returns:
-        Binary mask (numpy array)
+        Binary mask (numpy array; out if given)
     """
     h, w = image_shape
-    mask = np.zeros((h, w), dtype=np.uint8)
+    if out is None:
+        mask = np.zeros((h, w), dtype=np.uint8)
+    else:
+        if out.shape != (h, w) or out.dtype != np.uint8:
+            raise ValueError(f"out must be a uint8 array of shape {(h, w)}, got {out.dtype} {out.shape}")
+        mask = out
+        mask.fill(0)
     
     if not label_path.exists():
         return mask
     
+    # Keep the first 5 fields of every complete line; columns are then
+    # converted and processed for all boxes at once
     with open(label_path, 'r') as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) < 5:
-                continue
-            
-            # Parse normalized bbox
-            class_id = int(parts[0])
-            x_center = float(parts[1])
-            y_center = float(parts[2])
-            bbox_width = float(parts[3])
-            bbox_height = float(parts[4])
-            
-            # Convert to pixel coordinates
-            x_center_px = int(x_center * w)
-            y_center_px = int(y_center * h)
-            bbox_w_px = int(bbox_width * w)
-            bbox_h_px = int(bbox_height * h)
-            
-            # Calculate bounding box corners
-            x1 = max(0, x_center_px - bbox_w_px // 2)
-            y1 = max(0, y_center_px - bbox_h_px // 2)
-            x2 = min(w, x_center_px + bbox_w_px // 2)
-            y2 = min(h, y_center_px + bbox_h_px // 2)
-            
-            # Fill mask region
-            mask[y1:y2, x1:x2] = 1
+        rows = [parts[:5] for parts in (line.split() for line in f) if len(parts) >= 5]
+    
+    if not rows:
+        return mask
+    
+    # Parse normalized bbox (class id unused)
+    boxes = np.array(rows, dtype=np.float64)
+    x_center, y_center, bbox_width, bbox_height = boxes[:, 1:].T
+    
+    # Convert to pixel coordinates (truncation, like int())
+    x_center_px = (x_center * w).astype(np.int64)
+    y_center_px = (y_center * h).astype(np.int64)
+    bbox_w_px = (bbox_width * w).astype(np.int64)
+    bbox_h_px = (bbox_height * h).astype(np.int64)
+    
+    # Calculate bounding box corners
+    x1 = np.maximum(0, x_center_px - bbox_w_px // 2)
+    y1 = np.maximum(0, y_center_px - bbox_h_px // 2)
+    x2 = np.minimum(w, x_center_px + bbox_w_px // 2)
+    y2 = np.minimum(h, y_center_px + bbox_h_px // 2)
+    
+    # Fill mask regions (a slice fill per box is memset speed; only the
+    # per-box parsing above was worth vectorizing)
+    for r0, r1, c0, c1 in zip(y1.tolist(), y2.tolist(), x1.tolist(), x2.tolist()):
+        mask[r0:r1, c0:c1] = 1
     
     return mask
 
 
+@njit(parallel=True, cache=True)
+def _confusion_kernel(pred, gt):
+    """Numba single pass: (intersection, set pixels in pred, set pixels in gt)."""
+    p = pred.ravel()
+    g = gt.ravel()
+    tp = 0
+    n_pred = 0
+    n_gt = 0
+    for i in prange(p.size):
+        a = 1 if p[i] > 0 else 0
+        b = 1 if g[i] > 0 else 0
+        tp += a & b
+        n_pred += a
+        n_gt += b
+    return tp, n_pred, n_gt
+
+
+def _confusion(mask_pred: np.ndarray, mask_gt: np.ndarray) -> Tuple[int, int, int, int]:
+    """
+    Pixel confusion counts of two binary masks in one sweep.
+    
+    Only the intersection is built; FP, FN and TN follow from the number of
+    set pixels in each mask. (A 2-bit code per pixel counted with np.bincount
+    is ~10x slower: bincount widens every pixel to an intp first.)
+    
+    Returns:
+        (tp, fp, fn, tn)
+    """
+    if HAS_NUMBA and mask_pred.shape == mask_gt.shape:
+        # No thresholded temporaries at all: one fused loop over both masks
+        tp, n_pred, n_gt = _confusion_kernel(
+            np.ascontiguousarray(mask_pred), np.ascontiguousarray(mask_gt)
+        )
+        size = mask_pred.size
+    else:
+        pred = mask_pred > 0
+        gt = mask_gt > 0
+        n_pred = np.count_nonzero(pred)
+        n_gt = np.count_nonzero(gt)
+        # Empty prediction or background-only frame: no intersection to build
+        tp = np.count_nonzero(np.logical_and(pred, gt, out=pred)) if n_pred and n_gt else 0
+        size = pred.size
+    
+    fp = n_pred - tp
+    fn = n_gt - tp
+    tn = size - tp - fp - fn
+    return int(tp), int(fp), int(fn), int(tn)
+
+
+def _iou_from_counts(tp: int, fp: int, fn: int) -> float:
+    """IoU = |pred AND gt| / |pred OR gt|; two empty masks are a perfect match."""
+    union = tp + fp + fn
+    if union == 0:
+        return 1.0
+    return float(tp) / float(union)
+
+
+def _pixel_metrics_from_counts(tp: int, fp: int, fn: int, tn: int) -> Dict[str, float]:
+    """Precision/recall/F1 dictionary of compute_pixel_metrics from confusion counts."""
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
+    
+    return {
+        'true_positives': int(tp),
+        'false_positives': int(fp),
+        'false_negatives': int(fn),
+        'true_negatives': int(tn),
+        'precision': float(precision),
+        'recall': float(recall),
+        'f1_score': float(f1)
+    }
+
+
+def pack_mask(mask: np.ndarray) -> np.ndarray:
+    """
+    Bit-packs a binary mask, 8 pixels per byte (flattened, zero padded).
+    
+    Packed masks are 8x smaller to keep around (e.g. ground truth reused
+    across detector runs) and are compared with compute_iou_packed.
+    
+    Args:
+        mask: Binary mask (any pixel > 0 is set)
+    
+    Returns:
+        1D uint8 array of ceil(mask.size / 8) bytes
+    """
+    return np.packbits(np.asarray(mask) > 0, axis=None)
+
+
+def _popcount(bits: np.ndarray) -> int:
+    """Number of set bits in a uint8 array."""
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(bits).sum(dtype=np.int64))
+    return int(_POPCOUNT_LUT[bits].sum(dtype=np.int64))
+
+
+def compute_iou_packed(bits_pred: np.ndarray, bits_gt: np.ndarray) -> float:
+    """
+    IoU of two masks packed with pack_mask (same image shape).
+    
+    Intersection and union are computed on the packed bytes, so each
+    operation streams 1/8 of the bytes of the unpacked masks.
+    
+    Args:
+        bits_pred: Packed predicted mask
+        bits_gt: Packed ground truth mask
+    
+    Returns:
+        IoU score (0-1), same as compute_iou on the unpacked masks
+    """
+    if bits_pred.shape != bits_gt.shape:
+        raise ValueError(f"Packed mask sizes differ: {bits_pred.shape} vs {bits_gt.shape}")
+    
+    intersection = _popcount(np.bitwise_and(bits_pred, bits_gt))
+    union = _popcount(np.bitwise_or(bits_pred, bits_gt))
+    
+    if union == 0:
+        # Both masks empty - perfect match
+        return 1.0
+    
+    return float(intersection) / float(union)
+
+
 def compute_iou(mask_pred: np.ndarray, mask_gt: np.ndarray) -> float:
     """
     Compute Intersection over Union (IoU) for binary masks.
@@ -96,14 +238,52 @@ def compute_iou(mask_pred: np.ndarray, mask_gt: np.ndarray) -> float:
     Returns:
         IoU score (0-1)
     """
-    intersection = np.logical_and(mask_pred > 0, mask_gt > 0).sum()
-    union = np.logical_or(mask_pred > 0, mask_gt > 0).sum()
+    tp, fp, fn, _ = _confusion(mask_pred, mask_gt)
+    return _iou_from_counts(tp, fp, fn)
+
+
+def _integral_image(mask: np.ndarray) -> np.ndarray:
+    """
+    Summed-area table of the set pixels of mask, with a leading zero row and
+    column: the count inside rows y1:y2, cols x1:x2 is
+    S[y2, x2] - S[y1, x2] - S[y2, x1] + S[y1, x1].
+    """
+    h, w = mask.shape
+    table = np.zeros((h + 1, w + 1), dtype=np.int64)
+    np.cumsum(mask > 0, axis=0, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+
+def compute_box_ious(pred_boxes: np.ndarray, mask_gt: np.ndarray) -> np.ndarray:
+    """
+    IoU of each predicted box against a ground truth mask.
     
-    if union == 0:
-        # Both masks empty - perfect match
-        return 1.0 if intersection == 0 else 0.0
+    For predictions given as boxes rather than a dense mask: one integral
+    image of the ground truth per frame, then 4 lookups per box for its
+    intersection, instead of rasterizing every box and comparing masks.
     
-    return float(intersection) / float(union)
+    Args:
+        pred_boxes: (N, 4) pixel boxes (x1, y1, x2, y2), half-open like the
+                    mask slices of parse_yolo_label; clipped to the image
+        mask_gt: Ground truth mask (binary)
+    
+    Returns:
+        (N,) IoU of each box (1.0 for an empty box against an empty mask)
+    """
+    h, w = mask_gt.shape
+    table = _integral_image(mask_gt)
+    gt_area = table[-1, -1]
+    
+    boxes = np.asarray(pred_boxes, dtype=np.int64).reshape(-1, 4)
+    x1 = np.clip(boxes[:, 0], 0, w)
+    y1 = np.clip(boxes[:, 1], 0, h)
+    x2 = np.clip(boxes[:, 2], x1, w)
+    y2 = np.clip(boxes[:, 3], y1, h)
+    
+    inter = table[y2, x2] - table[y1, x2] - table[y2, x1] + table[y1, x1]
+    union = (x2 - x1) * (y2 - y1) + gt_area - inter
+    return np.divide(inter, union, out=np.ones(len(boxes)), where=union > 0)
 
 
 def compute_pixel_metrics(mask_pred: np.ndarray, mask_gt: np.ndarray) -> Dict[str, float]:
@@ -117,27 +297,7 @@ def compute_pixel_metrics(mask_pred: np.ndarray, mask_gt: np.ndarray) -> Dict[st
     Returns:
         Dictionary with TP, FP, FN, TN counts and precision/recall/f1
     """
-    pred_binary = (mask_pred > 0).astype(bool)
-    gt_binary = (mask_gt > 0).astype(bool)
-    
-    tp = np.logical_and(pred_binary, gt_binary).sum()
-    fp = np.logical_and(pred_binary, ~gt_binary).sum()
-    fn = np.logical_and(~pred_binary, gt_binary).sum()
-    tn = np.logical_and(~pred_binary, ~gt_binary).sum()
-    
-    precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
-    recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
-    
-    return {
-        'true_positives': int(tp),
-        'false_positives': int(fp),
-        'false_negatives': int(fn),
-        'true_negatives': int(tn),
-        'precision': float(precision),
-        'recall': float(recall),
-        'f1_score': float(f1)
-    }
+    return _pixel_metrics_from_counts(*_confusion(mask_pred, mask_gt))
 
 
 def evaluate_single_frame(
@@ -158,8 +318,10 @@ def evaluate_single_frame(
     Returns:
         DetectionMetrics object
     """
-    iou = compute_iou(mask_pred, mask_gt)
-    pixel_metrics = compute_pixel_metrics(mask_pred, mask_gt)
+    # IoU and pixel metrics share one confusion-count sweep over the masks
+    tp, fp, fn, tn = _confusion(mask_pred, mask_gt)
+    iou = _iou_from_counts(tp, fp, fn)
+    pixel_metrics = _pixel_metrics_from_counts(tp, fp, fn, tn)
     
     return DetectionMetrics(
         iou=iou,
@@ -174,27 +336,16 @@ def evaluate_single_frame(
     )
 
 
-def aggregate_metrics(metrics_list: List[DetectionMetrics]) -> Dict[str, float]:
+def _summarize(scores: np.ndarray, total_tp: int, total_fp: int, total_fn: int) -> Dict[str, float]:
     """
-    Aggregate metrics across multiple frames.
+    Summary statistics of aggregate_metrics.
     
     Args:
-        metrics_list: List of DetectionMetrics from individual frames
-    
-    Returns:
-        Dictionary with aggregated statistics
+        scores: (4, N) iou/precision/recall/f1 of the frames, each row contiguous
+        total_tp, total_fp, total_fn: Pixel counts summed over the frames
     """
-    if not metrics_list:
-        return {}
-    
-    ious = [m.iou for m in metrics_list]
-    precisions = [m.precision for m in metrics_list]
-    recalls = [m.recall for m in metrics_list]
-    f1s = [m.f1_score for m in metrics_list]
-    
-    total_tp = sum(m.true_positives for m in metrics_list)
-    total_fp = sum(m.false_positives for m in metrics_list)
-    total_fn = sum(m.false_negatives for m in metrics_list)
+    ious = scores[0]
+    mean_iou, mean_precision, mean_recall, mean_f1 = scores.mean(axis=1)
     
     # Global precision/recall (micro-average)
     global_precision = total_tp / (total_tp + total_fp) if (total_tp + total_fp) > 0 else 0.0
@@ -203,13 +354,13 @@ def aggregate_metrics(metrics_list: List[DetectionMetrics]) -> Dict[str, float]:
                 if (global_precision + global_recall) > 0 else 0.0
     
     return {
-        'num_frames': len(metrics_list),
-        'mean_iou': float(np.mean(ious)),
+        'num_frames': scores.shape[1],
+        'mean_iou': float(mean_iou),
         'std_iou': float(np.std(ious)),
         'median_iou': float(np.median(ious)),
-        'mean_precision': float(np.mean(precisions)),
-        'mean_recall': float(np.mean(recalls)),
-        'mean_f1': float(np.mean(f1s)),
+        'mean_precision': float(mean_precision),
+        'mean_recall': float(mean_recall),
+        'mean_f1': float(mean_f1),
         'global_precision': float(global_precision),
         'global_recall': float(global_recall),
         'global_f1': float(global_f1),
@@ -219,8 +370,98 @@ def aggregate_metrics(metrics_list: List[DetectionMetrics]) -> Dict[str, float]:
     }
 
 
+def aggregate_metrics(metrics_list: List[DetectionMetrics]) -> Dict[str, float]:
+    """
+    Aggregate metrics across multiple frames.
+    
+    Args:
+        metrics_list: List of DetectionMetrics from individual frames
+    
+    Returns:
+        Dictionary with aggregated statistics
+    """
+    if not metrics_list:
+        return {}
+    
+    # One pass over the frames into column arrays (one row per field, each
+    # contiguous) instead of a Python comprehension per field
+    scores = np.array(
+        [(m.iou, m.precision, m.recall, m.f1_score) for m in metrics_list], dtype=np.float64
+    ).T.copy()
+    counts = np.array(
+        [(m.true_positives, m.false_positives, m.false_negatives) for m in metrics_list], dtype=np.int64
+    )
+    total_tp, total_fp, total_fn = counts.sum(axis=0).tolist()
+    
+    return _summarize(scores, total_tp, total_fp, total_fn)
+
+
+class OnlineAggregator:
+    """
+    Accumulates frame metrics as they are produced, without keeping the
+    DetectionMetrics objects.
+    
+    Only the report's per-frame fields are kept, in column arrays (48 bytes
+    per frame), plus running pixel totals. The exact median and the same
+    pairwise sums as aggregate_metrics need every value, so the summary is
+    identical to aggregate_metrics over the same frames.
+    
+    Usage:
+        agg = OnlineAggregator()
+        for ...: agg.add(evaluate_single_frame(...))
+        generate_validation_report(agg, detector_name, dataset_name)
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self._scores = np.empty((4, max(1, capacity)), dtype=np.float64)
+        self._streaks = np.empty((2, max(1, capacity)), dtype=np.int64)
+        self._n = 0
+        self.total_tp = 0
+        self.total_fp = 0
+        self.total_fn = 0
+    
+    def __len__(self) -> int:
+        return self._n
+    
+    def add(self, m: DetectionMetrics) -> None:
+        """Adds one frame's metrics."""
+        if self._n == self._scores.shape[1]:
+            # Grow geometrically so adding stays amortized O(1)
+            self._scores = np.concatenate([self._scores, np.empty_like(self._scores)], axis=1)
+            self._streaks = np.concatenate([self._streaks, np.empty_like(self._streaks)], axis=1)
+        
+        self._scores[:, self._n] = (m.iou, m.precision, m.recall, m.f1_score)
+        self._streaks[:, self._n] = (m.num_gt_streaks, m.num_pred_streaks)
+        self.total_tp += m.true_positives
+        self.total_fp += m.false_positives
+        self.total_fn += m.false_negatives
+        self._n += 1
+    
+    def summary(self) -> Dict[str, float]:
+        """Same dictionary as aggregate_metrics over the frames added so far."""
+        if self._n == 0:
+            return {}
+        # Row slices of a C-ordered array stay contiguous
+        return _summarize(self._scores[:, :self._n], self.total_tp, self.total_fp, self.total_fn)
+    
+    def frame_details(self) -> List[Dict[str, float]]:
+        """Per-frame entries of the validation report, in the order added."""
+        return list(self.iter_frame_details())
+    
+    def iter_frame_details(self, chunk: int = 4096) -> Iterator[Dict[str, float]]:
+        """
+        Yields the per-frame entries one at a time, converting the columns
+        chunk frames at a time, so only one chunk of dicts exists at once.
+        """
+        for start in range(0, self._n, chunk):
+            stop = min(start + chunk, self._n)
+            columns = self._scores[:, start:stop].tolist() + self._streaks[:, start:stop].tolist()
+            for row in zip(*columns):
+                yield dict(zip(_DETAIL_FIELDS, row))
+
+
 def generate_validation_report(
-    metrics_list: List[DetectionMetrics],
+    metrics_list: Union[List[DetectionMetrics], OnlineAggregator],
     detector_name: str,
     dataset_name: str,
     output_path: Optional[Path] = None
@@ -229,36 +470,45 @@ def generate_validation_report(
     Generate comprehensive validation report.
     
     Args:
-        metrics_list: List of frame-level metrics
+        metrics_list: List of frame-level metrics, or an OnlineAggregator
+                      they were added to
         detector_name: Name of the detector being evaluated
         dataset_name: Name of the validation dataset
         output_path: Optional path to save JSON report
     
     Returns:
-        Report dictionary
+        Report dictionary. For an OnlineAggregator with an output_path the
+        per-frame details are streamed to the file from its columns and
+        left out of the returned dictionary, so they never exist as N
+        Python dicts; use OnlineAggregator.frame_details() for them.
     """
+    if isinstance(metrics_list, OnlineAggregator):
+        report = {
+            'detector': detector_name,
+            'dataset': dataset_name,
+            'summary': metrics_list.summary()
+        }
+        if output_path:
+            write_json_rows(output_path, report, 'per_frame_details', metrics_list.iter_frame_details())
+            logger.info(f"Validation report saved to {output_path}")
+        else:
+            report['per_frame_details'] = metrics_list.frame_details()
+        return report
+    
     aggregated = aggregate_metrics(metrics_list)
+    # attrgetter reads all fields of a frame in one C call
+    frame_fields = attrgetter(*_DETAIL_FIELDS)
+    details = [dict(zip(_DETAIL_FIELDS, frame_fields(m))) for m in metrics_list]
     
     report = {
         'detector': detector_name,
         'dataset': dataset_name,
         'summary': aggregated,
-        'per_frame_details': [
-            {
-                'iou': m.iou,
-                'precision': m.precision,
-                'recall': m.recall,
-                'f1_score': m.f1_score,
-                'num_gt_streaks': m.num_gt_streaks,
-                'num_pred_streaks': m.num_pred_streaks
-            }
-            for m in metrics_list
-        ]
+        'per_frame_details': details
     }
     
     if output_path:
-        with open(output_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_json(output_path, report)
         logger.info(f"Validation report saved to {output_path}")
     
     return report
@@ -14,8 +14,11 @@ Creates:
 4. Error analysis
 """
 
+import argparse
 import json
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Files only: skip interactive backend probing
 import matplotlib.pyplot as plt
 from pathlib import Path
 from PIL import Image
@@ -25,13 +28,30 @@ import matplotlib.patches as patches
 plt.style.use('seaborn-v0_8-darkgrid')
 
 
+# Resolution of the working charts; the detector comparison and summary
+# table go in the paper and are saved at PUBLICATION_DPI
+DEFAULT_DPI = 150
+PUBLICATION_DPI = 300
+
+
+def save_figure(fig, output_path, dpi=DEFAULT_DPI):
+    """Save a chart and release its figure."""
+    if dpi < PUBLICATION_DPI:
+        # Working charts: fastest zlib level, larger files are fine
+        fig.savefig(output_path, dpi=dpi, bbox_inches='tight', pil_kwargs={'compress_level': 1})
+    else:
+        fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    print(f"Saved: {output_path}")
+    plt.close(fig)
+
+
 def load_validation_report(report_path):
     """Load validation report JSON."""
     with open(report_path, 'r') as f:
         return json.load(f)
 
 
-def plot_detector_comparison(reports, output_dir):
+def plot_detector_comparison(reports, output_dir, dpi=PUBLICATION_DPI):
     """Create comparison bar chart of detector performance."""
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
     fig.suptitle('Detector Performance Comparison', fontsize=16, fontweight='bold')
@@ -90,12 +110,10 @@ def plot_detector_comparison(reports, output_dir):
     
     plt.tight_layout()
     output_path = output_dir / 'detector_comparison.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    print(f"Saved: {output_path}")
-    plt.close()
+    save_figure(fig, output_path, dpi)
 
 
-def plot_iou_distribution(reports, output_dir):
+def plot_iou_distribution(reports, output_dir, dpi=DEFAULT_DPI):
     """Plot IoU distribution across frames."""
     fig, ax = plt.subplots(figsize=(12, 6))
     
@@ -110,12 +128,10 @@ def plot_iou_distribution(reports, output_dir):
     ax.grid(True, alpha=0.3)
     
     output_path = output_dir / 'iou_distribution.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    print(f"Saved: {output_path}")
-    plt.close()
+    save_figure(fig, output_path, dpi)
 
 
-def plot_confusion_matrix(report, output_dir, detector_name):
+def plot_confusion_matrix(report, output_dir, detector_name, dpi=DEFAULT_DPI):
     """Plot confusion matrix."""
     summary = report['summary']
     
@@ -151,12 +167,10 @@ def plot_confusion_matrix(report, output_dir, detector_name):
     plt.tight_layout()
     
     output_path = output_dir / f'confusion_matrix_{detector_name}.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    print(f"Saved: {output_path}")
-    plt.close()
+    save_figure(fig, output_path, dpi)
 
 
-def create_summary_table(reports, output_dir):
+def create_summary_table(reports, output_dir, dpi=PUBLICATION_DPI):
     """Create summary table as image."""
     fig, ax = plt.subplots(figsize=(14, len(reports) * 1.5 + 2))
     ax.axis('tight')
@@ -197,12 +211,10 @@ def create_summary_table(reports, output_dir):
     plt.title('Validation Results Summary', fontsize=16, fontweight='bold', pad=20)
     
     output_path = output_dir / 'summary_table.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    print(f"Saved: {output_path}")
-    plt.close()
+    save_figure(fig, output_path, dpi)
 
 
-def analyze_performance_by_category(report, output_dir, detector_name):
+def analyze_performance_by_category(report, output_dir, detector_name, dpi=DEFAULT_DPI):
     """Analyze performance on different frame categories."""
     frames = report['per_frame_details']
     
@@ -253,14 +265,19 @@ def analyze_performance_by_category(report, output_dir, detector_name):
     
     plt.tight_layout()
     output_path = output_dir / f'category_analysis_{detector_name}.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    print(f"Saved: {output_path}")
-    plt.close()
+    save_figure(fig, output_path, dpi)
     
     return stats
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Analyze and plot validation results")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI,
+                        help="Resolution of the working charts")
+    parser.add_argument("--publication-dpi", type=int, default=PUBLICATION_DPI,
+                        help="Resolution of the detector comparison and summary table")
+    args = parser.parse_args()
+    
     # Paths
     results_dir = Path('results')
     analysis_dir = results_dir / 'analysis'
@@ -290,25 +307,25 @@ def main():
     
     # 1. Detector comparison
     print("📊 Creating detector comparison chart...")
-    plot_detector_comparison(reports, analysis_dir)
+    plot_detector_comparison(reports, analysis_dir, args.publication_dpi)
     
     # 2. IoU distribution
     print("📊 Creating IoU distribution plot...")
-    plot_iou_distribution(reports, analysis_dir)
+    plot_iou_distribution(reports, analysis_dir, args.dpi)
     
     # 3. Confusion matrices
     for name, report in reports.items():
         print(f"📊 Creating confusion matrix for {name}...")
-        plot_confusion_matrix(report, analysis_dir, name.replace(' ', '_'))
+        plot_confusion_matrix(report, analysis_dir, name.replace(' ', '_'), args.dpi)
     
     # 4. Summary table
     print("📊 Creating summary table...")
-    create_summary_table(reports, analysis_dir)
+    create_summary_table(reports, analysis_dir, args.publication_dpi)
     
     # 5. Category analysis
     for name, report in reports.items():
         print(f"📊 Analyzing categories for {name}...")
-        stats = analyze_performance_by_category(report, analysis_dir, name.replace(' ', '_'))
+        stats = analyze_performance_by_category(report, analysis_dir, name.replace(' ', '_'), args.dpi)
     
     print(f"\n{'='*60}")
     print("DETAILED STATISTICS")
@@ -0,0 +1,86 @@
+# Author: Andres Espin
+# Email: aaespin3@espe.edu.ec
+# Role: Junior Developer
+# Purpose: Independent Research Study
+
+"""
+Round-trip check of write_fits/read_fits headers.
+
+Writes a header with an undefined keyword, HIERARCH keywords and
+COMMENT/HISTORY cards through write_fits (fitsio path for uint8 masks,
+astropy for float images) and checks that read_fits gives them back.
+Exits with status 1 on any mismatch.
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+from astropy.io import fits
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orbitalskyshield.core.io_fits import write_fits, read_fits
+
+
+def build_header():
+    header = fits.Header()
+    header['UNDEF'] = None
+    header['OBJECT'] = ('M31', 'target')
+    header['EXPTIME'] = (30.0, 'seconds')
+    header['FLAG'] = True
+    header['HIERARCH ESO DET CHIP TEMP'] = -120.5
+    header['HIERARCH ESO OBS NAME'] = 'long name'
+    header['DATE-OBS'] = '2024-01-01T00:00:00'
+    header['COMMENT'] = 'first comment'
+    header['COMMENT'] = 'second comment'
+    header['HISTORY'] = 'reduced'
+    return header
+
+
+def check_roundtrip(path, dtype):
+    """Returns the list of mismatches for one data type."""
+    header = build_header()
+    write_fits(path, np.zeros((4, 5), dtype=dtype), header)
+    read_header = read_fits(path).header
+
+    problems = []
+    for key in ('UNDEF', 'OBJECT', 'EXPTIME', 'FLAG', 'ESO DET CHIP TEMP', 'ESO OBS NAME', 'DATE-OBS'):
+        expected = header[key]
+        got = read_header.get(key, 'MISSING')
+        if isinstance(expected, fits.card.Undefined):
+            ok = got is None or isinstance(got, fits.card.Undefined)
+        else:
+            ok = type(got) is type(expected) and got == expected
+        if not ok:
+            problems.append(f"{key}: expected {expected!r}, got {got!r}")
+
+    for key in ('COMMENT', 'HISTORY'):
+        expected = list(header[key])
+        got = list(read_header[key]) if key in read_header else []
+        # CFITSIO prepends its standard FITS format COMMENT cards
+        if got[-len(expected):] != expected:
+            problems.append(f"{key}: expected {expected!r} at the end, got {got!r}")
+
+    return problems
+
+
+def main():
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in (np.uint8, np.float32):
+            problems = check_roundtrip(os.path.join(tmp, "roundtrip.fits"), dtype)
+            name = np.dtype(dtype).name
+            if problems:
+                failed = True
+                print(f"[MISMATCH] {name}")
+                for problem in problems:
+                    print(f"    {problem}")
+            else:
+                print(f"[OK] {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
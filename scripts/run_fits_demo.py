@@ -19,7 +19,9 @@ from orbitalskyshield.skyglow.physical_model import natural_sky_brightness, esti
 
 def load_fits_data(filepath):
     """Simple FITS loader for demo"""
-    with fits.open(filepath) as hdul:
+    # Only the primary HDU is used: lazy loading never parses the extensions,
+    # and the image is read once (no memmap) since it is scanned several times
+    with fits.open(filepath, lazy_load_hdus=True, memmap=False) as hdul:
         data = hdul[0].data
         header = hdul[0].header
         return data, header
@@ -62,8 +64,9 @@ def run_demo_pipeline():
             image_data, header = load_fits_data(fpath)
             
             # Normalize if needed (AdaptiveDetector expects reasonable range, but percentile handles most)
-            if image_data.max() > 0:
-                print(f"  Image Stats: Min={image_data.min()}, Max={image_data.max()}, Mean={image_data.mean():.2f}")
+            data_max = image_data.max()
+            if data_max > 0:
+                print(f"  Image Stats: Min={image_data.min()}, Max={data_max}, Mean={image_data.mean():.2f}")
             
             # 2. Run Detector
             print("  Running AdaptiveDetector...", end="", flush=True)
@@ -91,8 +94,11 @@ def run_demo_pipeline():
             )
             
             # Estimate ODC (Compare model to image median background)
-            # Simple background estimation: median of pixels
-            observed_bg_counts = np.median(image_data)
+            # Simple background estimation: median of every 32nd pixel. An
+            # approximation, fine for the background level (streaks and stars
+            # are a small fraction of pixels) but not for exact statistics
+            sample = image_data.ravel()[::32]
+            observed_bg_counts = np.partition(sample, sample.size // 2)[sample.size // 2]
             # Convert counts to mag/arcsec^2 (Very rough calibration for demo)
             # Assuming ZeroPoint=25.0
             if observed_bg_counts > 0:
@@ -12,13 +12,19 @@ This script evaluates the baseline or ML detector on a labeled dataset
 """
 
 import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import Optional, Tuple
 import json
 from tqdm import tqdm
 from PIL import Image
 import numpy as np
 
 from orbitalskyshield.validation import (
+    DetectionMetrics,
+    OnlineAggregator,
     parse_yolo_label,
     evaluate_single_frame,
     generate_validation_report
@@ -28,6 +34,101 @@ from orbitalskyshield.core.logging import get_logger
 logger = get_logger()
 
 
+def build_detector(name: str, threshold_sigma: float, percentile: float, min_aspect_ratio: float):
+    """Detector selected on the command line."""
+    if name == "baseline":
+        from orbitalskyshield.streak_detection.baseline_detector import BaselineDetector
+        return BaselineDetector(
+            threshold_sigma=threshold_sigma,
+            line_width=3
+        )
+    elif name == "improved":
+        from orbitalskyshield.streak_detection.improved_detector import ImprovedDetector
+        return ImprovedDetector(
+            threshold_sigma=threshold_sigma,
+            min_aspect_ratio=min_aspect_ratio
+        )
+    elif name == "adaptive":
+        from orbitalskyshield.streak_detection.improved_detector import AdaptiveDetector
+        return AdaptiveDetector(
+            percentile_thresh=percentile,
+            min_aspect_ratio=min_aspect_ratio
+        )
+    else:
+        raise NotImplementedError(f"Detector {name} not implemented yet")
+
+
+# Detector built once per worker process by _init_worker
+_worker_detector = None
+
+# Per-process ground truth mask buffer, reused while the image size is unchanged
+_mask_gt_buf: Optional[np.ndarray] = None
+
+
+def _init_worker(detector_args: tuple) -> None:
+    """ProcessPoolExecutor initializer: build the detector once per worker."""
+    global _worker_detector
+    _worker_detector = build_detector(*detector_args)
+
+
+def validate_frame(img_path: Path, labels_dir: Path,
+                   detector=None) -> Tuple[Optional[DetectionMetrics], Optional[str]]:
+    """
+    Detect streaks in one image and evaluate them against its label.
+    
+    Top-level so it can run in a worker process; errors are returned instead
+    of raised so the parent can log them.
+    
+    Args:
+        detector: Detector to use; defaults to the one _init_worker built
+                  for this worker process
+    
+    Returns:
+        (metrics, error)
+    """
+    global _mask_gt_buf
+    try:
+        detector = detector or _worker_detector
+        
+        # Load image as grayscale (already single-channel files are used as
+        # decoded; asarray wraps PIL's buffer instead of copying it again)
+        with Image.open(img_path) as img:
+            if img.mode != 'L':
+                img = img.convert('L')
+            img_array = np.asarray(img)
+        
+        # Get corresponding label
+        label_path = labels_dir / f"{img_path.stem}.txt"
+        
+        # Parse ground truth mask
+        if _mask_gt_buf is None or _mask_gt_buf.shape != img_array.shape:
+            _mask_gt_buf = np.empty(img_array.shape, dtype=np.uint8)
+        mask_gt = parse_yolo_label(label_path, img_array.shape, out=_mask_gt_buf)
+        
+        # Count GT streaks (number of lines in label file)
+        num_gt_streaks = 0
+        if label_path.exists():
+            with open(label_path, 'r') as f:
+                num_gt_streaks = len([line for line in f if line.strip()])
+        
+        # Run detector
+        detection_result = detector.detect(img_array)
+        mask_pred = detection_result.mask
+        num_pred_streaks = detection_result.meta.get('detected_lines', 0)
+        
+        # Evaluate
+        frame_metrics = evaluate_single_frame(
+            mask_pred,
+            mask_gt,
+            num_gt_streaks=num_gt_streaks,
+            num_pred_streaks=num_pred_streaks
+        )
+        return frame_metrics, None
+    
+    except Exception as e:
+        return None, str(e)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Validate streak detector against ground truth dataset"
@@ -75,6 +176,12 @@ def main():
         default=None,
         help="Maximum number of samples to process (for testing)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: all cores, 1 = serial)"
+    )
     
     args = parser.parse_args()
     
@@ -95,26 +202,8 @@ def main():
     
     # Initialize detector
     logger.info(f"Initializing {args.detector} detector...")
-    if args.detector == "baseline":
-        from orbitalskyshield.streak_detection.baseline_detector import BaselineDetector
-        detector = BaselineDetector(
-            threshold_sigma=args.threshold_sigma,
-            line_width=3
-        )
-    elif args.detector == "improved":
-        from orbitalskyshield.streak_detection.improved_detector import ImprovedDetector
-        detector = ImprovedDetector(
-            threshold_sigma=args.threshold_sigma,
-            min_aspect_ratio=args.min_aspect_ratio
-        )
-    elif args.detector == "adaptive":
-        from orbitalskyshield.streak_detection.improved_detector import AdaptiveDetector
-        detector = AdaptiveDetector(
-            percentile_thresh=args.percentile,
-            min_aspect_ratio=args.min_aspect_ratio
-        )
-    else:
-        raise NotImplementedError(f"Detector {args.detector} not implemented yet")
+    detector_args = (args.detector, args.threshold_sigma, args.percentile, args.min_aspect_ratio)
+    detector = build_detector(*detector_args)
     
     # Get image files
     image_files = sorted(list(images_dir.glob("*.jpeg")) + 
@@ -126,51 +215,36 @@ def main():
     
     logger.info(f"Found {len(image_files)} images to process")
     
-    # Process each image
-    metrics_list = []
+    # Process each image (frames are independent, so by default use every core)
+    # Frame metrics are aggregated as they arrive instead of kept as objects
+    aggregator = OnlineAggregator(capacity=len(image_files))
     failed_files = []
+    n_workers = args.workers or os.cpu_count() or 1
     
-    for img_path in tqdm(image_files, desc="Validating"):
-        try:
-            # Load image
-            img = Image.open(img_path)
-            img_array = np.array(img.convert('L'))  # Convert to grayscale
-            
-            # Get corresponding label
-            label_path = labels_dir / f"{img_path.stem}.txt"
-            
-            # Parse ground truth mask
-            mask_gt = parse_yolo_label(label_path, img_array.shape)
-            
-            # Count GT streaks (number of lines in label file)
-            num_gt_streaks = 0
-            if label_path.exists():
-                with open(label_path, 'r') as f:
-                    num_gt_streaks = len([line for line in f if line.strip()])
-            
-            # Run detector
-            detection_result = detector.detect(img_array)
-            mask_pred = detection_result.mask
-            num_pred_streaks = detection_result.meta.get('detected_lines', 0)
-            
-            # Evaluate
-            frame_metrics = evaluate_single_frame(
-                mask_pred,
-                mask_gt,
-                num_gt_streaks=num_gt_streaks,
-                num_pred_streaks=num_pred_streaks
-            )
-            
-            metrics_list.append(frame_metrics)
-            
-        except Exception as e:
-            logger.error(f"Failed to process {img_path.name}: {e}")
-            failed_files.append(str(img_path))
+    def collect(results):
+        for img_path, (frame_metrics, error) in tqdm(zip(image_files, results), total=len(image_files),
+                                                     desc="Validating"):
+            if error is None:
+                aggregator.add(frame_metrics)
+            else:
+                logger.error(f"Failed to process {img_path.name}: {error}")
+                failed_files.append(str(img_path))
+    
+    if n_workers == 1 or len(image_files) <= 1:
+        collect(validate_frame(img_path, labels_dir, detector) for img_path in image_files)
+    else:
+        logger.info(f"Processing with {n_workers} worker processes")
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(detector_args,)) as executor:
+            # Hand out images in small batches to cut inter-process overhead
+            chunksize = max(1, len(image_files) // (n_workers * 4))
+            collect(executor.map(partial(validate_frame, labels_dir=labels_dir), image_files,
+                                 chunksize=chunksize))
     
     # Generate report
     logger.info("Generating validation report...")
     report = generate_validation_report(
-        metrics_list=metrics_list,
+        metrics_list=aggregator,
         detector_name=f"{args.detector}_sigma{args.threshold_sigma}",
         dataset_name=dataset_dir.name,
         output_path=output_dir / "validation_report.json"
@@ -15,30 +15,90 @@ Shows:
 """
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Files only: skip interactive backend probing
 import matplotlib.pyplot as plt
 from pathlib import Path
 from PIL import Image
 import random
 
 from orbitalskyshield.streak_detection.improved_detector import AdaptiveDetector
-from orbitalskyshield.validation import parse_yolo_label
+from orbitalskyshield.validation import parse_yolo_label, evaluate_single_frame
+from orbitalskyshield.core.jit import HAS_NUMBA, njit, prange
+
+
+# Overlay colors by code: background (unused), FN = red, FP = blue, TP = green
+OVERLAY_PALETTE = np.array([[0, 0, 0], [255, 0, 0], [0, 0, 255], [0, 255, 0]], dtype=np.uint8)
+
+
+@njit(parallel=True, cache=True)
+def _overlay_kernel(img, gt, pred, palette, out):
+    """Numba single pass: reads the three inputs and writes the RGB pixel."""
+    h, w = img.shape
+    for i in prange(h):
+        for j in range(w):
+            code = (1 if gt[i, j] > 0 else 0) | (2 if pred[i, j] > 0 else 0)
+            if code:
+                out[i, j, 0] = palette[code, 0]
+                out[i, j, 1] = palette[code, 1]
+                out[i, j, 2] = palette[code, 2]
+            else:
+                v = img[i, j]
+                out[i, j, 0] = v
+                out[i, j, 1] = v
+                out[i, j, 2] = v
+    return out
+
+
+def build_overlay(img_gray, gt_mask, pred_mask):
+    """
+    RGB comparison image: TP green, FN red, FP blue, elsewhere the image.
+    
+    Args:
+        img_gray: uint8 grayscale image
+        gt_mask: Ground truth mask (binary)
+        pred_mask: Predicted mask (binary)
+    
+    Returns:
+        (H, W, 3) uint8 array
+    """
+    if HAS_NUMBA:
+        out = np.empty((*img_gray.shape, 3), dtype=np.uint8)
+        return _overlay_kernel(img_gray, gt_mask, pred_mask, OVERLAY_PALETTE, out)
+    # One 2-bit code per pixel (bit 0 = GT, bit 1 = prediction) picks the
+    # color from the palette; unmarked pixels keep the image
+    code = (gt_mask > 0).view(np.uint8) | ((pred_mask > 0).view(np.uint8) << 1)
+    return np.where(code[..., None] > 0, OVERLAY_PALETTE[code], img_gray[..., None])
+
+
+def load_gray(image_path):
+    """Grayscale pixels of an image, decoded once and shared by every panel."""
+    with Image.open(image_path) as img:
+        if img.mode != 'L':
+            img = img.convert('L')
+        return np.asarray(img)
 
 
 def visualize_detection(image_path, label_path, detector, output_path):
     """Create 4-panel visualization of detection."""
     # Load image
-    img = Image.open(image_path)
-    img_gray = np.array(img.convert('L'))
+    img_gray = load_gray(image_path)
     
     # Load ground truth
     gt_mask = parse_yolo_label(label_path, img_gray.shape)
     
     # Run detector
     detection = detector.detect(img_gray)
+    
+    return plot_detection(image_path, label_path, img_gray, gt_mask, detection, output_path)
+
+
+def plot_detection(image_path, label_path, img_gray, gt_mask, detection, output_path):
+    """4-panel visualization of an image already loaded and run through the detector."""
     pred_mask = detection.mask
     
     # Create figure
-    fig, axes = plt.subplots(2, 2, figsize=(14, 14))
+    fig, axes = plt.subplots(2, 2, figsize=(14, 14), sharex=True, sharey=True)
     
     # Original image
     axes[0, 0].imshow(img_gray, cmap='gray')
@@ -60,31 +120,16 @@ def visualize_detection(image_path, label_path, detector, output_path):
     
     # Overlay comparison
     # Green = True Positive, Red = False Negative, Blue = False Positive
-    overlay = np.zeros((*img_gray.shape, 3), dtype=np.uint8)
-    overlay[:,:,0] = img_gray  # R channel = image
-    overlay[:,:,1] = img_gray  # G channel = image
-    overlay[:,:,2] = img_gray  # B channel = image
-    
-    # True Positive (where both are 1) - Green
-    tp_mask = (gt_mask > 0) & (pred_mask > 0)
-    overlay[tp_mask] = [0, 255, 0]
-    
-    # False Negative (GT but not predicted) - Red
-    fn_mask = (gt_mask > 0) & (pred_mask == 0)
-    overlay[fn_mask] = [255, 0, 0]
-    
-    # False Positive (predicted but not GT) - Blue
-    fp_mask = (gt_mask == 0) & (pred_mask > 0)
-    overlay[fp_mask] = [0, 0, 255]
+    overlay = build_overlay(img_gray, gt_mask, pred_mask)
     
     axes[1, 1].imshow(overlay)
     axes[1, 1].set_title('Comparison (Green=TP, Red=FN, Blue=FP)', fontsize=14, fontweight='bold')
     axes[1, 1].axis('off')
     
-    # Calculate metrics
-    from orbitalskyshield.validation import compute_pixel_metrics, compute_iou
-    iou = compute_iou(pred_mask, gt_mask)
-    metrics = compute_pixel_metrics(pred_mask, gt_mask)
+    # Calculate metrics (IoU and pixel metrics from one confusion-count sweep)
+    frame = evaluate_single_frame(pred_mask, gt_mask)
+    iou = frame.iou
+    metrics = {'precision': frame.precision, 'recall': frame.recall, 'f1_score': frame.f1_score}
     
     # Add metrics text
     metrics_text = f"""
@@ -141,62 +186,75 @@ def main():
     random.seed(42)
     sample_images = random.sample(image_files, min(30, len(image_files)))
     
-    results = []
+    # Examples are picked as the images are scored: the first image that fits
+    # an empty category takes it, and scoring stops once every category is
+    # filled instead of running the detector on the whole sample
+    first = None  # fallback for low_iou
+    best = None   # highest IoU so far, fallback for high_iou
     for img_path in sample_images:
         label_path = labels_dir / f"{img_path.stem}.txt"
         
-        img_gray = np.array(Image.open(img_path).convert('L'))
+        img_gray = load_gray(img_path)
         gt_mask = parse_yolo_label(label_path, img_gray.shape)
         detection = detector.detect(img_gray)
         
-        from orbitalskyshield.validation import compute_iou
-        iou = compute_iou(detection.mask, gt_mask)
-        has_gt = gt_mask.sum() > 0
-        has_pred = detection.mask.sum() > 0
+        # One sweep gives the IoU and whether each mask has any pixel set
+        frame = evaluate_single_frame(detection.mask, gt_mask)
+        has_gt = frame.true_positives + frame.false_negatives > 0
+        has_pred = frame.true_positives + frame.false_positives > 0
         
-        results.append({
+        r = {
             'path': img_path,
-            'iou': iou,
+            'iou': frame.iou,
             'has_gt': has_gt,
-            'has_pred': has_pred
-        })
-    
-    # Sort by IoU
-    results.sort(key=lambda x: x['iou'], reverse=True)
-    
-    # Find examples
-    for r in results:
+            'has_pred': has_pred,
+            # Kept so the chosen examples are plotted without decoding and
+            # detecting them again
+            'img_gray': img_gray,
+            'gt_mask': gt_mask,
+            'detection': detection
+        }
+        if first is None:
+            first = r
+        if best is None or r['iou'] > best['iou']:
+            best = r
+        
         if examples['high_iou'] is None and r['iou'] > 0.1:
-            examples['high_iou'] = r['path']
+            examples['high_iou'] = r
         elif examples['medium_iou'] is None and 0.01 < r['iou'] <= 0.1:
-            examples['medium_iou'] = r['path']
+            examples['medium_iou'] = r
         elif examples['low_iou'] is None and r['iou'] > 0 and r['iou'] <= 0.01:
-            examples['low_iou'] = r['path']
+            examples['low_iou'] = r
         elif examples['false_positive'] is None and not r['has_gt'] and r['has_pred']:
-            examples['false_positive'] = r['path']
+            examples['false_positive'] = r
         elif examples['true_negative'] is None and not r['has_gt'] and not r['has_pred']:
-            examples['true_negative'] = r['path']
+            examples['true_negative'] = r
+        
+        if all(example is not None for example in examples.values()):
+            break
     
     # Fallbacks
-    if examples['high_iou'] is None and results:
-        examples['high_iou'] = results[0]['path']
+    if examples['high_iou'] is None and best is not None:
+        examples['high_iou'] = best
     if examples['low_iou'] is None:
-        examples['low_iou'] = sample_images[0]
+        examples['low_iou'] = first
     
     print(f"\n{'='*60}")
     print("CREATING DETECTION VISUALIZATIONS")
     print(f"{'='*60}\n")
     
     # Create visualizations for each category
-    for category, img_path in examples.items():
-        if img_path is None:
+    for category, r in examples.items():
+        if r is None:
             continue
         
+        img_path = r['path']
         label_path = labels_dir / f"{img_path.stem}.txt"
         output_path = output_dir / f"{category}_{img_path.stem}.png"
         
         print(f"📸 Processing {category}: {img_path.name}")
-        iou, metrics = visualize_detection(img_path, label_path, detector, output_path)
+        iou, metrics = plot_detection(img_path, label_path, r['img_gray'], r['gt_mask'],
+                                      r['detection'], output_path)
         print(f"   IoU: {iou:.4f}, Precision: {metrics['precision']:.4f}, Recall: {metrics['recall']:.4f}\n")
     
     print(f"{'='*60}")
@@ -7,6 +7,8 @@
 import os
 import sys
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Files only: skip interactive backend probing
 import matplotlib.pyplot as plt
 from astropy.io import fits
 from astropy.visualization import ZScaleInterval
@@ -42,14 +44,22 @@ def save_evidence(filename, output_name, title_suffix):
     interval = ZScaleInterval()
     vmin, vmax = interval.get_limits(data)
     
-    axes[0].imshow(data, cmap='gray', vmin=vmin, vmax=vmax, origin='lower')
+    # Scale once to a float32 [0, 1] image shared by both panels, instead of
+    # matplotlib normalizing the float64 frame for each of them. Flat frames
+    # (vmin == vmax) come out black, as imshow(vmin=vmin, vmax=vmax) draws them
+    scale = (vmax - vmin) or 1.0
+    base = data.astype(np.float32, copy=False) - np.float32(vmin)
+    base /= np.float32(scale)
+    np.clip(base, 0, 1, out=base)
+    
+    axes[0].imshow(base, cmap='gray', vmin=0, vmax=1, origin='lower')
     axes[0].set_title(f"Original Image: {filename}", fontsize=14)
     axes[0].axis('off')
     
     # Detected Mask Overlay
-    axes[1].imshow(data, cmap='gray', vmin=vmin, vmax=vmax, origin='lower')
+    axes[1].imshow(base, cmap='gray', vmin=0, vmax=1, origin='lower')
     # Create red overlay for mask
-    mask_overlay = np.zeros((*data.shape, 4))
+    mask_overlay = np.zeros((*data.shape, 4), dtype=np.float32)
     mask_overlay[result.mask > 0] = [1, 0, 0, 0.5] # Red, 50% opacity
     
     axes[1].imshow(mask_overlay, origin='lower')
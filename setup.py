@@ -25,6 +25,11 @@ setup(
     ],
     python_requires=">=3.9",
     extras_require={
+        "fast": [
+            "fitsio>=1.1",
+            "numba>=0.56",
+            "orjson>=3.6",
+        ],
         "dev": [
             "pytest>=7.0",
             "black>=23.0",